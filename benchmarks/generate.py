@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+File: generate.py
+Author: Rob Phoenix
+Email: rob@robphoenix.com
+Github: https://github.com/robphoenix
+Description: Generate synthetic Cisco IOS baselines and configs to benchmark
+
+"""
+import random
+
+JUNK = [
+    'Building configuration...',
+    'Current configuration : {} bytes',
+    '! Last configuration change at 12:32:40 UTC Thu Oct 27 2016',
+    '! NVRAM config last updated at 16:10:30 UTC Tue Nov 8 2016 by admin',
+    'ntp clock-period {}',
+]
+
+IGNORES = ['Building configuration', 'Current configuration',
+           'Last configuration change', 'NVRAM config last updated',
+           'ntp clock-period']
+
+
+class Value(object):
+    """A value of a line, which may be a variable in the baseline."""
+
+    def __init__(self, name, kind, text):
+        self.name = name
+        self.kind = kind
+        self.text = text
+
+
+def _ipv4(rng):
+    return '10.{}.{}.{}'.format(rng.randint(0, 255), rng.randint(0, 255),
+                                rng.randint(1, 254))
+
+
+def _word(rng):
+    return rng.choice(['USERS', 'VOICE', 'MGMT', 'CCTV', 'PRINTERS',
+                       'GUEST', 'SERVERS', 'UPLINK']) + str(rng.randint(1, 99))
+
+
+def _interface(rng, n, size):
+    parent = ['interface GigabitEthernet{}/{}'.format(n // 48, n % 48)]
+    children = [
+        [' description ', Value('DESCRIPTION', 'word', _word(rng))],
+        [' switchport access vlan ', Value('VLAN', 'int',
+                                           str(rng.randint(2, 4094)))],
+        [' switchport mode access'],
+        [' spanning-tree portfast'],
+        [' ip address ', Value('IP', 'ipv4', _ipv4(rng)), ' 255.255.255.0'],
+        [' storm-control broadcast level ', Value('LEVEL', 'int',
+                                                  str(rng.randint(1, 99)))],
+        [' no shutdown'],
+    ]
+    return parent, children[:size]
+
+
+def _vlan(rng, n, size):
+    return (['vlan {}'.format(n + 2)],
+            [[' name ', Value('NAME', 'word', _word(rng))]][:size])
+
+
+def _access_list(rng, n, size):
+    children = [[' permit tcp host ', Value('HOST', 'ipv4', _ipv4(rng)),
+                 ' any eq {}'.format(rng.choice([22, 80, 443, 8080, 3389]))]
+                for _ in range(size)]
+    return (['ip access-list extended ACL-{}'.format(n)], children)
+
+
+def _single(rng, n, size):
+    line = rng.choice([
+        ['logging host ', Value('LOGHOST', 'ipv4', _ipv4(rng))],
+        ['ntp server ', Value('NTP', 'ipv4', _ipv4(rng))],
+        ['snmp-server community ', Value('COMMUNITY', 'word', _word(rng)),
+         ' RO'],
+        ['ip route ', Value('ROUTE', 'ipv4', _ipv4(rng)),
+         ' 255.255.255.255 ', Value('NEXTHOP', 'ipv4', _ipv4(rng))],
+    ])
+    return (line + [' {}'.format(n)], [])
+
+
+BLOCKS = [(_interface, 5), (_vlan, 2), (_access_list, 2), (_single, 3)]
+
+
+def _blocks(rng, lines, block_size):
+    kinds = [kind for kind, weight in BLOCKS for _ in range(weight)]
+    blocks, total, n = [], 0, 0
+    while total < lines:
+        kind = rng.choice(kinds)
+        size = max(1, int(rng.gauss(block_size, block_size / 3.0)))
+        parent, children = kind(rng, n, size)
+        blocks.append([parent] + children)
+        total += len(children) + 1
+        n += 1
+    return blocks
+
+
+def _render(parts, variables):
+    text = []
+    for part in parts:
+        if isinstance(part, Value):
+            if part in variables:
+                text.append('{{{{ {}:{} }}}}'.format(part.name, part.kind))
+            else:
+                text.append(part.text)
+        else:
+            text.append(part)
+    return ''.join(text)
+
+
+def generate(seed=0, lines=1000, block_size=4, variables=0.2, ignores=10,
+             drift=0.05, configs=1):
+    """Generate a baseline, lines to ignore and configs that drift from it.
+
+    The same seed always gives the same baseline and configs.
+
+    Kwargs:
+        seed (int): Seed of the random number generator
+        lines (int): Approximate number of lines of the baseline
+        block_size (int): Average number of child lines of a block
+        variables (float): Fraction of values that are variables
+            in the baseline
+        ignores (int): Number of lines to ignore
+        drift (float): Fraction of lines of each config that are
+            missing, changed or additional
+        configs (int): Number of configs
+
+    Returns:
+        tuple: Lines of the baseline, the lines to ignore and a list
+            of the lines of each config
+
+    """
+    rng = random.Random(seed)
+    blocks = _blocks(rng, lines, block_size)
+    values = [part for block in blocks for line in block for part in line
+              if isinstance(part, Value)]
+    templated = set(value for value in values if rng.random() < variables)
+    baseline = [_render(line, templated) for block in blocks
+                for line in block]
+    ignore_lines = IGNORES[:ignores]
+    features = max(0, ignores - len(IGNORES))
+    ignore_lines += ['^feature-{} '.format(i) for i in range(features)]
+    return (baseline, ignore_lines,
+            [_config(random.Random(seed * 1000003 + i + 1), blocks, templated,
+                     drift, features) for i in range(configs)])
+
+
+def _fill(rng, value):
+    fill = {'int': lambda rng: str(rng.randint(2, 4094)),
+            'word': _word, 'ipv4': _ipv4}[value.kind]
+    return Value(value.name, value.kind, fill(rng))
+
+
+def _config(rng, blocks, templated, drift, features):
+    lines = [junk.format(rng.randint(1000, 99999)) for junk in JUNK]
+    for block in blocks:
+        for i, line in enumerate(block):
+            changed = False
+            if rng.random() < drift:
+                change = rng.randint(0, 2)
+                if change == 0 and i:
+                    continue  # missing
+                if change == 1:
+                    lines.append(' ' * bool(i) + 'additional {}'.format(
+                        rng.randint(0, 1 << 30)))
+                changed = change == 2
+            filled = [_fill(rng, part) if isinstance(part, Value) and
+                      (changed or part in templated) else part
+                      for part in line]
+            lines.append(_render(filled, ()))
+        lines.append('!')
+    for i in range(features):
+        lines.append('feature-{} enabled'.format(i))
+    lines.append('end')
+    return lines
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+File: run.py
+Author: Rob Phoenix
+Email: rob@robphoenix.com
+Github: https://github.com/robphoenix
+Description: Benchmark parsing, partitioning and comparing Cisco IOS configs
+
+"""
+from __future__ import print_function
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import timeit
+
+try:
+    import tracemalloc
+except ImportError:  # Python 2
+    tracemalloc = None
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import diffios
+from generate import generate
+
+
+def measure(setup, phase, repeat):
+    """Best wall time and peak memory of a phase of diffios.
+
+    The phase is timed repeat times, each time on a fresh value
+    from setup, and its peak memory is measured once more after,
+    as tracing memory slows Python down.
+
+    Args:
+        setup (callable): Returns the argument of phase
+        phase (callable): Phase of diffios to measure
+        repeat (int): Number of times to time the phase
+
+    Returns:
+        tuple: Best time, in seconds, peak memory, in bytes, or None
+            if it cannot be measured, and the value of the phase
+
+    """
+    best = None
+    for _ in range(repeat):
+        argument = setup()
+        start = timeit.default_timer()
+        phase(argument)
+        elapsed = timeit.default_timer() - start
+        best = elapsed if best is None else min(best, elapsed)
+    argument = setup()
+    if tracemalloc is None:
+        return (best, None, phase(argument))
+    tracemalloc.start()
+    try:
+        value = phase(argument)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return (best, peak, value)
+
+
+def _write(directory, name, lines):
+    path = os.path.join(directory, name)
+    with open(path, 'w') as fout:
+        fout.write('\n'.join(lines) + '\n')
+    return path
+
+
+def _report(phase, best, peak):
+    memory = '-' if peak is None else '{:.0f}'.format(peak / 1024.0)
+    print('{:<12} {:>12.2f} {:>12}'.format(phase, best * 1000, memory))
+
+
+def _parser():
+    parser = argparse.ArgumentParser(
+        description='Benchmark diffios on synthetic Cisco IOS configs.')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--lines', type=int, default=5000,
+                        help='approximate lines of the baseline')
+    parser.add_argument('--block-size', type=int, default=4,
+                        help='average child lines of each block')
+    parser.add_argument('--variables', type=float, default=0.2,
+                        help='fraction of values that are variables')
+    parser.add_argument('--ignores', type=int, default=20,
+                        help='number of lines to ignore')
+    parser.add_argument('--drift', type=float, default=0.05,
+                        help='fraction of lines of each config that differ')
+    parser.add_argument('--fleet', type=int, default=100,
+                        help='number of configs compared in the fleet run')
+    parser.add_argument('--jobs', type=int, default=None,
+                        help='worker processes of the fleet run')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='times to time each phase')
+    return parser
+
+
+def main(argv=None):
+    args = _parser().parse_args(argv)
+    baseline, ignore_lines, configs = generate(
+        args.seed, args.lines, args.block_size, args.variables, args.ignores,
+        args.drift, max(1, args.fleet))
+    directory = tempfile.mkdtemp(prefix='diffios-bench-')
+    try:
+        baseline_path = _write(directory, 'baseline.txt', baseline)
+        paths = [_write(directory, 'config{:05}.txt'.format(i), config)
+                 for i, config in enumerate(configs)]
+        print('{} baseline lines, {} config lines, {} configs'.format(
+            len(baseline), len(configs[0]), len(configs)))
+        print('{:<12} {:>12} {:>12}'.format('phase', 'best (ms)',
+                                            'peak (KiB)'))
+
+        matcher = diffios.IgnoreMatcher(ignore_lines)
+        best, peak, _ = measure(lambda: paths[0],
+                                lambda path: diffios.Config(path, matcher),
+                                args.repeat)
+        _report('parse', best, peak)
+
+        best, peak, _ = measure(
+            lambda: diffios.Config(paths[0], matcher),
+            lambda config: config._partition_config(), args.repeat)
+        _report('partition', best, peak)
+
+        best, peak, compiled = measure(
+            lambda: diffios.Config(baseline_path, matcher),
+            diffios.Baseline.from_config, args.repeat)
+        _report('compile', best, peak)
+
+        comparison = diffios.Config(paths[0], matcher)
+        comparison._partition_config()
+        best, peak, _ = measure(
+            lambda: diffios.Compare(compiled, comparison),
+            diffios.Compare.result, args.repeat)
+        _report('compare', best, peak)
+
+        best, peak, _ = measure(
+            lambda: paths,
+            lambda paths: sum(1 for _ in diffios.compare_many(
+                compiled, paths, workers=args.jobs)),
+            1)
+        _report('fleet', best, peak)  # memory of this process only
+    finally:
+        shutil.rmtree(directory)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
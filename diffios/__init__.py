@@ -1,3 +1,13 @@
+from diffios.stats import Stats
+from diffios.cache import ConfigCache
 from diffios.config import Config
+from diffios.ignore import IgnoreMatcher
+from diffios.result import DiffResult
+from diffios.node import Node
+from diffios.sequence import edit_script
+from diffios.table import BlockTable
+from diffios.baseline import Baseline
 from diffios.compare import Compare
+from diffios.fleet import compare_many
+from diffios.metrics import FleetMetrics
 from diffios.constants import *
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+File: baseline.py
+Author: Rob Phoenix
+Email: rob@robphoenix.com
+Github: https://github.com/robphoenix
+Description: Compile a Cisco IOS baseline once, to compare many configs
+
+"""
+import re
+from collections import namedtuple
+
+import diffios
+from diffios.sequence import parent_matcher
+from diffios.stats import phase
+
+Compiled = namedtuple(
+    'Compiled', 'partition literals templates blocks patterns children')
+
+
+class Baseline(diffios.Config):
+    """Baseline is a diffios.Config compiled for comparing many configs.
+
+    Variables in a baseline, such as {{ HOSTNAME }}, match any
+    text. A variable can also be given a type, such as
+    {{ VLAN:int }}, which only matches text of that type. The
+    types are int, word (any text without spaces), ipv4,
+    ipv4mask, ipv4prefix (such as 10.0.0.0/8) and rest (any text,
+    to the end of the line). A variable with any other type after
+    its colon is treated as a variable without a type.
+
+    Comparing a config against a baseline involves work that only
+    depends on the baseline: parsing it and its lines to ignore,
+    separating the blocks containing variables from those that
+    do not, and building a regular expression for each line
+    containing variables. Baseline does this work once, so that it
+    can be reused for every config compared against it.
+
+    Args:
+        baseline (str|list|iterable): Path to baseline config file,
+            list or iterable containing lines of config
+
+    Kwargs:
+        ignore_lines (str|list|iterable): Path to ignores file,
+            list or iterable containing lines to ignore.
+            Defaults to empty list.
+        cache (diffios.ConfigCache): Cache of parsed configs.
+            Defaults to no cache.
+        ordered (bool): Keep blocks, and the differences found
+            when comparing configs, in the order they appear in
+            each config, rather than sorting them. Defaults to
+            False.
+        stats (diffios.Stats): Stats to record the time of each
+            phase of parsing and compiling the baseline, and of
+            comparing configs against it, in. Defaults to None.
+        table (diffios.BlockTable): Table to share identical blocks
+            of the configs compared against the baseline through,
+            and to remember the differences between blocks in.
+            Defaults to None.
+        sequences (list|diffios.IgnoreMatcher): Parent lines of
+            blocks whose children are compared in order, such as
+            '^ip access-list'. Defaults to None.
+
+    >>> baseline = Baseline([
+    ... 'hostname {{ hostname }}',
+    ... 'interface FastEthernet0/1',
+    ... ' switchport mode access'])
+    >>> diff = baseline.compare([
+    ... 'hostname ROUTER',
+    ... 'interface FastEthernet0/1',
+    ... ' switchport mode trunk'])
+    >>> diff.missing()
+    [['interface FastEthernet0/1', ' switchport mode access']]
+    >>> vlan = Baseline(['vlan {{ VLAN:int }}', ' name {{ NAME:word }}'])
+    >>> vlan.compare(['vlan 10', ' name USERS']).missing()
+    []
+    >>> vlan.compare(['vlan ten', ' name ALL USERS']).missing()
+    [['vlan {{ VLAN:int }}', ' name {{ NAME:word }}']]
+
+    """
+
+    def __init__(self, baseline, ignore_lines=None, cache=None,
+                 ordered=False, stats=None, table=None, sequences=None):
+        super(Baseline, self).__init__(baseline, ignore_lines, cache, ordered,
+                                       stats, table)
+        self._sequences(sequences)
+        self._compiled = None
+        self._compile()
+
+    @classmethod
+    def from_config(cls, config, sequences=None):
+        """Compile an existing diffios.Config as a Baseline.
+
+        The Baseline shares the parsed lines of the Config, so it
+        is not parsed again.
+
+        Args:
+            config (diffios.Config): Config to compile
+
+        Kwargs:
+            sequences (list|diffios.IgnoreMatcher): Parent lines of
+                blocks whose children are compared in order.
+                Defaults to None.
+
+        Returns:
+            diffios.Baseline: Compiled baseline
+
+        """
+        baseline = cls.__new__(cls)
+        baseline.__dict__.update(config.__dict__)
+        baseline._sequences(sequences)
+        baseline._compiled = None
+        baseline._compile()
+        return baseline
+
+    def _sequences(self, sequences):
+        self._sequence_matcher = parent_matcher(sequences)
+        self.sequences = (self._sequence_matcher.ignore_lines
+                          if self._sequence_matcher else [])
+
+    def _compile(self):
+        partition = self._partition_config()
+        if self._compiled is not None and self._compiled.partition is partition:
+            return self._compiled
+        with phase(self.stats, 'compile'):
+            literals, templates, blocks = [], [], []
+            patterns, children = {}, {}
+            for group, block in zip(partition.included, partition.blocks):
+                if diffios.DELIMITER_START in ' '.join(group):
+                    templates.append(group)
+                    blocks.append((group, block))
+                    for line in group:
+                        if line not in patterns:
+                            patterns[line] = self._compile_template(line)
+                    self._compile_nested(block, children)
+                else:
+                    literals.append((group, block))
+        self._compiled = Compiled(partition, literals, templates, blocks,
+                                  patterns, children)
+        return self._compiled
+
+    @classmethod
+    def _compile_nested(cls, block, children):
+        if block.children and block not in children:
+            children[block] = cls._compile_children(
+                [child.text for child in block.children])
+            for child in block.children:
+                cls._compile_nested(child, children)
+
+    @staticmethod
+    def _template_source(line, capture=True):
+        def variable(match):
+            name, typed, kind = match.group(0)[2:-2].rpartition(':')
+            pattern = '.+'
+            if typed:
+                pattern = diffios.VARIABLE_TYPES.get(kind.strip(), pattern)
+            return ('({})' if capture else '(?:{})').format(pattern)
+        for metacharacter in diffios.REGEX_METACHARACTERS:
+            if metacharacter in line:
+                line = line.replace(metacharacter,
+                                    '\\{}'.format(metacharacter))
+        return re.sub(diffios.DELIMITER, variable, line)
+
+    @classmethod
+    def _compile_template(cls, line):
+        return re.compile(cls._template_source(line) + r'\Z')
+
+    @classmethod
+    def _compile_children(cls, lines):
+        def most_literal(line):
+            return (-len(re.sub(diffios.DELIMITER, '', line)), line)
+        targets = sorted(set(lines), key=most_literal)
+        if not targets:
+            return (None, targets)
+        # an empty group ends each branch, rather than a group around
+        # it, so the branches can share their common leading text
+        alternation = '|'.join(
+            '{}(?P<t{}>)'.format(cls._template_source(line, capture=False), i)
+            for i, line in enumerate(targets))
+        return (re.compile('(?:{})\\Z'.format(alternation)), targets)
+
+    def literals(self):
+        """Blocks from the baseline without any variables.
+
+        Returns:
+            list: Pairs of included lines and diffios.Node blocks
+
+        """
+        return self._compile().literals
+
+    def templates(self):
+        """Blocks from the baseline containing variables.
+
+        Returns:
+            list: Included lines of each block
+
+        """
+        return self._compile().templates
+
+    def template_blocks(self):
+        """Blocks from the baseline containing variables, as trees.
+
+        Returns:
+            list: Pairs of included lines and diffios.Node blocks,
+                in the same order as templates()
+
+        """
+        return self._compile().blocks
+
+    def template(self, line):
+        """Compiled regular expression for a line of the baseline.
+
+        Each variable in the line matches any text, or any text of
+        its type, and the rest of the line must match exactly.
+
+        Args:
+            line (str): Line of the baseline
+
+        Returns:
+            re.RegexObject: Compiled pattern
+
+        """
+        patterns = self._compile().patterns
+        pattern = patterns.get(line)
+        if pattern is None:
+            pattern = patterns[line] = self._compile_template(line)
+        return pattern
+
+    def children(self, block, used=None):
+        """Compiled regular expression for the children of a block.
+
+        The lines nested directly beneath a block, or beneath any
+        block nested within it, from template_blocks() are compiled
+        into a single pattern, with a named group ending the branch
+        of each distinct child line, so that a line of config can
+        be matched against every child line in one pass. Child
+        lines with the most literal text are tried first.
+
+        Args:
+            block (diffios.Node): Block from template_blocks(), or
+                a block nested within it
+
+        Kwargs:
+            used (set): Child lines already used up, left out of the
+                pattern. The pattern is then compiled each time,
+                rather than kept. Defaults to None.
+
+        Returns:
+            tuple: The compiled pattern, or None if the block has no
+                children, and the child lines, where the child line
+                matched by group 't0' is first
+
+        """
+        if used:
+            return self._compile_children([child.text
+                                           for child in block.children
+                                           if child.text not in used])
+        children = self._compile().children
+        if block not in children:
+            children[block] = self._compile_children(
+                [child.text for child in block.children])
+        return children[block]
+
+    def compare(self, comparison, cache=None, stats=None, table=None):
+        """Compare a config against this baseline.
+
+        The config is parsed with the lines to ignore of this
+        baseline, and the differences are ordered, and the children
+        of sequences compared in order, as set for this baseline.
+
+        Args:
+            comparison (str|list|iterable|diffios.Config): Path to
+                comparison config file, list or iterable containing
+                lines of config, or diffios.Config object
+
+        Kwargs:
+            cache (diffios.ConfigCache): Cache of parsed configs.
+                Defaults to no cache.
+            stats (diffios.Stats): Stats to record the time of each
+                phase of the comparison in. Defaults to the stats of
+                this baseline.
+            table (diffios.BlockTable): Table to share the blocks of
+                the config through, and to remember the differences
+                between blocks in. Defaults to the table of this
+                baseline.
+
+        Returns:
+            diffios.Compare: Comparison of the config against this
+                baseline
+
+        """
+        if stats is None:
+            stats = self.stats
+        if table is None:
+            table = self.table
+        return diffios.Compare(self, comparison, self._ignore_matcher, cache,
+                               self.ordered, stats, table,
+                               self._sequence_matcher)
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+File: cache.py
+Author: Rob Phoenix
+Email: rob@robphoenix.com
+Github: https://github.com/robphoenix
+Description: Persistent on-disk cache of parsed Cisco IOS configs
+
+"""
+import hashlib
+import marshal
+import os
+import tempfile
+
+import diffios
+
+try:
+    from os import replace
+except ImportError:  # Python 2, where rename only replaces files on POSIX
+    def replace(src, dst):
+        if os.name == 'nt' and os.path.exists(dst):
+            os.remove(dst)
+        os.rename(src, dst)
+
+CACHE_VERSION = 2
+CACHE_SUFFIX = '.cache'
+
+
+class ConfigCache(object):
+    """ConfigCache stores parsed configs on disk between runs.
+
+    Parsing a config means reading it, removing invalid lines,
+    building its hierarchical blocks and partitioning them with
+    the lines to ignore. ConfigCache stores the result in a
+    directory, as a compact binary record, keyed by a hash of the
+    content of the config file and of the lines to ignore, so that
+    unchanged config files do not need to be parsed again.
+
+    When the records in the directory grow larger than max_size,
+    the least recently used records are removed. The size of the
+    directory is only measured when the ConfigCache is created,
+    so a directory should not be shared by concurrent runs.
+
+    Attributes:
+        directory (str): Directory holding the cached records
+        max_size (int): Maximum size of the cached records, in bytes
+
+    Args:
+        directory (str): Directory to hold the cached records,
+            created if it does not exist
+
+    Kwargs:
+        max_size (int): Maximum size of the cached records, in
+            bytes. Defaults to 100MB.
+
+    """
+
+    def __init__(self, directory, max_size=100 * 1024 * 1024):
+        self.directory = directory
+        self.max_size = max_size
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        self._size = sum(size for _, _, size in self._records())
+
+    def _records(self):
+        for name in os.listdir(self.directory):
+            if not name.endswith(CACHE_SUFFIX):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            yield (stat.st_mtime, path, stat.st_size)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + CACHE_SUFFIX)
+
+    @staticmethod
+    def key(path, ignore_lines, ordered=False):
+        """Hash of the content of a config file and the lines to ignore.
+
+        Args:
+            path (str): Path to config file
+            ignore_lines (list): List of lines to ignore
+
+        Kwargs:
+            ordered (bool): Whether the blocks of the config are kept
+                in their original order. Defaults to False.
+
+        Returns:
+            str: Hex digest identifying the parsed config
+
+        """
+        key = hashlib.sha1()
+        key.update('{}:{}\x00'.format(CACHE_VERSION,
+                                      marshal.version).encode('utf-8'))
+        key.update('\n'.join(ignore_lines).encode('utf-8') + b'\x00')
+        if ordered:
+            key.update(b'ordered\x00')
+        with open(path, 'rb') as fin:
+            for chunk in iter(lambda: fin.read(1024 * 1024), b''):
+                key.update(chunk)
+        return key.hexdigest()
+
+    def get(self, key):
+        """Load a parsed config from the cache.
+
+        Args:
+            key (str): Key returned by ConfigCache.key()
+
+        Returns:
+            tuple: The ignored lines and included blocks, as
+                diffios.Node objects, or None if the config is
+                not in the cache
+
+        """
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as fin:
+                ignored, blocks = marshal.loads(fin.read())
+            os.utime(path, None)  # mark as recently used
+        except (IOError, OSError, EOFError, ValueError, TypeError):
+            return None
+        return (ignored, [self._load_block(block) for block in blocks])
+
+    def put(self, key, ignored, blocks):
+        """Store a parsed config in the cache.
+
+        Args:
+            key (str): Key returned by ConfigCache.key()
+            ignored (list): Ignored lines of the config
+            blocks (list): Included blocks of the config, as
+                diffios.Node objects
+
+        """
+        record = marshal.dumps(
+            (ignored, [self._dump_block(block) for block in blocks]))
+        fd, tmp = tempfile.mkstemp(dir=self.directory)
+        with os.fdopen(fd, 'wb') as fout:
+            fout.write(record)
+        path = self._path(key)
+        if os.path.exists(path):
+            self._size -= os.path.getsize(path)
+        replace(tmp, path)  # never leave the record missing
+        self._size += len(record)
+        if self._size > self.max_size:
+            self._evict()
+
+    def _evict(self):
+        for _, path, size in sorted(self._records()):
+            if self._size <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            self._size -= size
+
+    @classmethod
+    def _dump_block(cls, block):
+        return (block.text,
+                tuple(cls._dump_block(child) for child in block.children))
+
+    @classmethod
+    def _load_block(cls, record):
+        text, children = record
+        return diffios.Node(text, [cls._load_block(c) for c in children])
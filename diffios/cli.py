@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+File: cli.py
+Author: Rob Phoenix
+Email: rob@robphoenix.com
+Github: https://github.com/robphoenix
+Description: Command line interface to compare Cisco IOS configs
+
+"""
+from __future__ import print_function
+
+import argparse
+import csv
+import glob
+import json
+import os
+import sys
+
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
+
+import diffios
+
+FORMATS = ('text', 'csv', 'jsonl')
+
+
+def _parser():
+    parser = argparse.ArgumentParser(
+        prog='diffios',
+        description='Compare Cisco IOS configs against a baseline template.')
+    parser.add_argument('baseline', help='baseline config file')
+    parser.add_argument(
+        'configs', nargs='+',
+        help='config files, directories of config files, or glob '
+        'patterns, such as "configs/*.txt", to compare')
+    parser.add_argument('-i', '--ignores', help='file of lines to ignore')
+    parser.add_argument(
+        '-j', '--jobs', type=int, default=None,
+        help='number of worker processes (default: number of CPUs)')
+    parser.add_argument(
+        '-f', '--format', choices=FORMATS, default='text',
+        help='output format (default: text)')
+    parser.add_argument(
+        '-o', '--output', help='file to write to (default: stdout)')
+    parser.add_argument(
+        '--ordered', action='store_true',
+        help='keep differences in config order rather than sorting them')
+    parser.add_argument(
+        '--sequence', action='append', metavar='PATTERN',
+        help='parent line of blocks whose lines are compared in order, '
+        'such as "^ip access-list" (can be given more than once)')
+    parser.add_argument(
+        '--stats', action='store_true',
+        help='write the time of each phase of the run to stderr')
+    parser.add_argument(
+        '--metrics', metavar='PATH',
+        help='write metrics of each config to a Prometheus textfile, '
+        'or to a JSON file if PATH ends with .json')
+    return parser
+
+
+def find_configs(patterns):
+    """Config files given as files, directories or glob patterns.
+
+    Directories are not searched recursively. Each config file is
+    given once, even when matched by more than one pattern.
+
+    Args:
+        patterns (list): Paths to config files or directories, or
+            glob patterns
+
+    Returns:
+        list: Paths to config files
+
+    """
+    configs, seen = [], set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            paths = sorted(os.path.join(pattern, name)
+                           for name in os.listdir(pattern))
+        elif glob.has_magic(pattern):
+            paths = sorted(glob.glob(pattern))
+        else:
+            paths = [pattern]
+        for path in paths:
+            if path not in seen and not os.path.isdir(path):
+                seen.add(path)
+                configs.append(path)
+    return configs
+
+
+class _TextWriter(object):
+    """Write each diff as a human readable delta."""
+
+    def __init__(self, fp, baseline):
+        self.fp = fp
+
+    def write(self, config, result):
+        self.fp.write("diffios: {}\n".format(config))
+        result.write_delta(self.fp)
+
+    def write_error(self, config, error):
+        self.fp.write("diffios: {}\nerror: {}\n".format(config, error))
+
+
+def _changes(write):
+    fp = StringIO()
+    write(fp)
+    return fp.getvalue()
+
+
+class _CsvWriter(object):
+    """Write each diff as a row of a CSV file."""
+
+    def __init__(self, fp, baseline):
+        self.baseline = os.path.basename(baseline)
+        self.writer = csv.writer(fp, lineterminator='\n')
+        self.writer.writerow(["Comparison", "Baseline", "Additional",
+                              "Missing", "Error"])
+
+    def write(self, config, result):
+        self.writer.writerow([
+            config,
+            self.baseline,
+            _changes(result.write_additional),
+            _changes(result.write_missing),
+            ''
+        ])
+
+    def write_error(self, config, error):
+        self.writer.writerow([config, self.baseline, '', '', error])
+
+
+class _JsonLinesWriter(object):
+    """Write each diff as a JSON object on a line of its own."""
+
+    def __init__(self, fp, baseline):
+        self.fp = fp
+        self.baseline = baseline
+
+    def write(self, config, result):
+        self.fp.write(json.dumps({
+            'comparison': config,
+            'baseline': self.baseline,
+            'missing': result.missing,
+            'additional': result.additional,
+        }) + "\n")
+
+    def write_error(self, config, error):
+        self.fp.write(json.dumps({
+            'comparison': config,
+            'baseline': self.baseline,
+            'error': error,
+        }) + "\n")
+
+
+WRITERS = {'text': _TextWriter, 'csv': _CsvWriter, 'jsonl': _JsonLinesWriter}
+
+
+def main(argv=None):
+    """Compare config files against a baseline from the command line.
+
+    Results are written as each config is compared, in the order
+    the comparisons finish. A config that cannot be read or compared
+    is written as an error, and the run carries on, but ends with a
+    non-zero exit status.
+
+    Kwargs:
+        argv (list): Command line arguments. Defaults to
+            sys.argv[1:].
+
+    Returns:
+        int: Exit status
+
+    """
+    args = _parser().parse_args(argv)
+    configs = find_configs(args.configs)
+    output = sys.stdout if args.output is None else open(args.output, 'w')
+    stats = diffios.Stats() if args.stats else None
+    metrics = diffios.FleetMetrics() if args.metrics else None
+    failed = 0
+    try:
+        baseline = diffios.Baseline(args.baseline, args.ignores,
+                                    ordered=args.ordered, stats=stats,
+                                    sequences=args.sequence)
+        writer = WRITERS[args.format](output, args.baseline)
+        for config, result in diffios.compare_many(
+                baseline, configs, workers=args.jobs, stats=stats,
+                metrics=metrics, keep_going=True):
+            if isinstance(result, Exception):
+                error = str(result).strip() or type(result).__name__
+                print("diffios: {}: {}".format(config, error),
+                      file=sys.stderr)
+                writer.write_error(config, error)
+                failed += 1
+            else:
+                writer.write(config, result)
+            output.flush()
+        if stats is not None:
+            print(stats.report(), file=sys.stderr)
+        if metrics is not None:
+            metrics.save(args.metrics)
+    except RuntimeError as e:
+        print("diffios: {}".format(e), file=sys.stderr)
+        return 1
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
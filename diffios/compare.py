@@ -7,22 +7,33 @@ Email: rob@robphoenix.com
 Github: https://github.com/robphoenix
 Description: Compare and diff Cisco IOS configs
 """
-import re
-from collections import namedtuple
+from collections import deque, namedtuple
 
 try:
     from queue import Queue
 except ImportError:
     from Queue import Queue
 
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
+
 import diffios
+from diffios.sequence import edit_script, parent_matcher
+from diffios.stats import counting, phase
+
+ChildComparison = namedtuple('ChildComparison', 'additional missing')
+Summary = namedtuple(
+    'Summary', 'missing_groups missing_lines additional_groups additional_lines')
 
 
 class Compare(object):
     """Compare compares a Cisco IOS config against a baseline.
 
     Compare takes a baseline config and a comparison config.
-    These can be files, lists or diffios.Config objects. If
+    These can be files, lists, iterables of lines or
+    diffios.Config objects. If
     they are not diffios.Config objects they will be converted
     to these. Compare can also take a list of lines to ignore,
     as a list or a file, or default to an ignores.txt file in
@@ -42,6 +53,13 @@ class Compare(object):
         comparison(diffios.Config): A diffios.Config object,
             initialised with the comparison config
         ignore_lines(list): List of lines to ignore
+        ordered(bool): Whether differences are kept in config order
+        stats(diffios.Stats): Stats recording the time of each
+            phase, or None
+        table(diffios.BlockTable): Table remembering the
+            differences between blocks, or None
+        sequences(list): Parent lines of blocks whose children are
+            compared in order
 
     >>> baseline = [
     ... 'hostname {{ hostname }}',
@@ -88,144 +106,447 @@ class Compare(object):
 
     """
 
-    def __init__(self, baseline, comparison, ignore_lines=None):
+    def __init__(self, baseline, comparison, ignore_lines=None, cache=None,
+                 ordered=False, stats=None, table=None, sequences=None):
         """Initialize a diffios.Compare object with a baseline,
             a comparison and lines to ignore.
 
         Args:
-            baseline (str|list|diffios.Config): Path to baseline
-                config file, list containing lines of config,
-                or diffios.Config object
-            comparison (str|list|diffios.Config): Path to comparison
-                config file, list containing lines of config,
-                or diffios.Config object
+            baseline (str|list|iterable|diffios.Config): Path to
+                baseline config file, list or iterable containing
+                lines of config, or diffios.Config object. Use a
+                diffios.Baseline object to compare many configs
+                against the same baseline.
+            comparison (str|list|iterable|diffios.Config): Path to
+                comparison config file, list or iterable containing
+                lines of config, or diffios.Config object
 
         Kwargs:
-            ignore_lines (str|list): Path to ignores file, or list
-                containing lines to ignore. Defaults to ignores
+            ignore_lines (str|list|diffios.IgnoreMatcher): Path to
+                ignores file, list containing lines to ignore, or
+                compiled diffios.IgnoreMatcher. Defaults to ignores
                 file in current working directory if it exists.
+            cache (diffios.ConfigCache): Cache of parsed configs,
+                used for configs given as paths. Defaults to no
+                cache.
+            ordered (bool): Keep the differences in the order they
+                appear in each config, missing lines in baseline
+                order and additional lines in comparison order,
+                with no sorting. Configs given as diffios.Config
+                objects keep the order they were created with.
+                Defaults to False, sorting the differences.
+            stats (diffios.Stats): Stats to record the time of each
+                phase of parsing and comparing the configs in, and
+                the number of regular expressions evaluated.
+                Defaults to None, recording nothing.
+            table (diffios.BlockTable): Table to share identical
+                blocks through, and to remember the differences
+                between a baseline block and a comparison block in,
+                so that blocks repeated across a batch are only
+                compared once. Configs given as diffios.Config
+                objects should be created with the same table.
+                Defaults to None.
+            sequences (list|diffios.IgnoreMatcher): Parent lines of
+                blocks whose children are compared in order, such as
+                '^ip access-list' or '^route-map', treated in the
+                same way as lines to ignore. A child out of order is
+                both missing and additional. Defaults to None,
+                comparing the children of every block as a set.
 
         """
         self._baseline = baseline
         self._comparison = comparison
         self._ignore_lines = ignore_lines
-
-        if isinstance(self._baseline, diffios.Config):
+        self.ordered = ordered
+        self.stats = stats
+        self.table = table
+        self._sequence_matcher = parent_matcher(sequences)
+        self.sequences = (self._sequence_matcher.ignore_lines
+                          if self._sequence_matcher else [])
+
+        if isinstance(self._baseline, diffios.Baseline):
             self.baseline = self._baseline
+        elif isinstance(self._baseline, diffios.Config):
+            self.baseline = diffios.Baseline.from_config(
+                self._baseline, self._sequence_matcher)
         else:
-            self.baseline = diffios.Config(self._baseline, self._ignore_lines)
+            self.baseline = diffios.Baseline(self._baseline,
+                                             self._ignore_lines, cache,
+                                             ordered, stats, table,
+                                             self._sequence_matcher)
         if isinstance(self._comparison, diffios.Config):
             self.comparison = self._comparison
         else:
             self.comparison = diffios.Config(self._comparison,
-                                             self._ignore_lines)
+                                             self._ignore_lines, cache,
+                                             ordered, stats, table)
         if self.baseline and self.comparison:
             self.ignore_lines = self.baseline.ignore_lines
+        self._result = None
 
-    @staticmethod
-    def _compare_lines(target, guess):
-        for metacharacter in diffios.REGEX_METACHARACTERS:
-            if metacharacter in target:
-                target = target.replace(metacharacter,
-                                        '\{}'.format(metacharacter))
-        target_re = re.sub(r'{{[^{}]+}}', '(.+)', target)
-        match = re.search(target_re, guess)
-        if match:
-            return match.group(0) == guess
-        else:
-            return False
+    def _compare_lines(self, target, guess):
+        return self.baseline.template(target).match(guess) is not None
+
+    def _in_sequence(self, parent):
+        return (self._sequence_matcher is not None and
+                self._sequence_matcher.search(parent))
+
+    def _unchanged(self, baseline_block, comparison_block):
+        return (comparison_block.digest == baseline_block.digest and
+                not self._in_sequence(baseline_block.text))
 
     def _baseline_queue(self):
         bq = Queue()
-        [bq.put(el) for el in self.baseline.included()]
+        [bq.put(el) for el in self.baseline.literals()]
         return bq
 
     def _comparison_hash(self):
-        return {group[0]: group[1:] for group in self.comparison.included()}
+        return {block.text: block for block in self.comparison.blocks()}
 
     @staticmethod
-    def _child_lookup(baseline_parent, baseline_children, comparison_children):
-        ChildComparison = namedtuple('ChildComparison', 'additional missing')
-        missing = []
-        for baseline_child in baseline_children:
-            if baseline_child not in comparison_children and not missing:
-                missing.append(baseline_parent)
-                missing.append(baseline_child)
-            elif baseline_child not in comparison_children:
-                missing.append(baseline_child)
-            elif baseline_child in comparison_children:
-                comparison_children.remove(baseline_child)
-        if comparison_children:
-            additional = [baseline_parent] + comparison_children
-        else:
-            additional = []
+    def _pair_children(baseline_block, comparison_block):
+        """Pair the children of two matching blocks with the same line.
+
+        The comparison children are held as a multiset, mapping each
+        line to the positions it occurs at, so pairing is linear in
+        the number of children. Repeated lines are paired in order,
+        each baseline occurrence taking the first unpaired
+        comparison occurrence.
+
+        Returns:
+            tuple: Pairs of each baseline child with the position of
+                its comparison child, or None, and whether each
+                comparison child was paired
+
+        """
+        comparison_children = comparison_block.children
+        positions = {}
+        for i, comparison_child in enumerate(comparison_children):
+            positions.setdefault(comparison_child.text, deque()).append(i)
+        matched = [False] * len(comparison_children)
+        pairs = []
+        for baseline_child in baseline_block.children:
+            occurrences = positions.get(baseline_child.text)
+            if occurrences:
+                i = occurrences.popleft()
+                matched[i] = True
+                pairs.append((baseline_child, i))
+            else:
+                pairs.append((baseline_child, None))
+        return (pairs, matched)
+
+    def _pair_templates(self, baseline_block, comparison_block):
+        """Pair the children of a templated block with the lines they match.
+
+        Each comparison child is matched once against a single
+        pattern compiled from the children of the baseline block,
+        and paired with the first unpaired baseline child with the
+        line it matches. Each match is counted in the
+        template_matches of the stats. When that line has been used
+        up, the pattern is compiled again from the child lines that
+        remain, and the comparison child matched against it.
+
+        Returns:
+            tuple: Pairs as for _pair_children
+
+        """
+        baseline_children = baseline_block.children
+        unpaired = {}
+        for j, baseline_child in enumerate(baseline_children):
+            unpaired.setdefault(baseline_child.text, deque()).append(j)
+        paired = [None] * len(baseline_children)
+        matched = [False] * len(comparison_block.children)
+        pattern, targets = self.baseline.children(baseline_block)
+        used = set()
+        matches = 0
+        for i, comparison_child in enumerate(comparison_block.children):
+            while pattern is not None:
+                matches += 1
+                match = pattern.match(comparison_child.text)
+                if not match:
+                    break
+                child_target = targets[int(match.lastgroup[1:])]
+                if unpaired[child_target]:
+                    paired[unpaired[child_target].popleft()] = i
+                    matched[i] = True
+                    break
+                used.add(child_target)
+                pattern, targets = self.baseline.children(baseline_block, used)
+        if self.stats is not None:
+            self.stats.count('template_matches', matches)
+        return (list(zip(baseline_children, paired)), matched)
+
+    def _child_lookup(self, baseline_block, comparison_block, templated=False):
+        """Lines nested beneath a pair of matching blocks that differ.
+
+        Children with the same line, or of a templated block, the
+        line they match, are paired, then compared in turn, so that
+        nested blocks are matched as units. Differing lines nested
+        more than one level deep are given with the lines they are
+        nested beneath, for context. Unless ordered, the children of
+        templated blocks are given sorted.
+
+        """
+        comparison_children = comparison_block.children
+        pair = self._pair_templates if templated else self._pair_children
+        pairs, matched = pair(baseline_block, comparison_block)
+        positions = range(len(comparison_children))
+        if templated and not self.ordered:
+            pairs.sort(key=lambda item: item[0].text)
+            positions = sorted(positions,
+                               key=lambda i: comparison_children[i].text)
+        missing, nested_additional = [], {}
+        for baseline_child, i in pairs:
+            if i is None:
+                missing.extend(baseline_child.lines())
+                continue
+            comparison_child = comparison_children[i]
+            if baseline_child.digest == comparison_child.digest:
+                continue
+            if baseline_child.children or comparison_child.children:
+                nested = self._child_lookup(baseline_child, comparison_child,
+                                            templated)
+                if nested.missing:
+                    missing.append(baseline_child.text)
+                    missing.extend(nested.missing)
+                nested_additional[i] = nested.additional
+        additional = []
+        for i in positions:
+            comparison_child = comparison_children[i]
+            if not matched[i]:
+                additional.extend(comparison_child.lines())
+            elif nested_additional.get(i):
+                additional.append(comparison_child.text)
+                additional.extend(nested_additional[i])
         return ChildComparison(additional, missing)
 
-    def _child_search(self, target_children, comparison_children):
-        ChildComparison = namedtuple('ChildComparison', 'additional missing')
-        missing = []
-        while target_children:
-            child_target = target_children.pop()
-            child_search = self._binary_search(child_target,
-                                               comparison_children)
-            if child_search:
-                comparison_children.remove(child_search)
+    def _block_lookup(self, baseline_block, comparison_block, templated=False):
+        """Lines nested beneath a pair of matching blocks that differ.
+
+        The children are compared in order if the parent line is
+        one of the sequences, and as a set otherwise. With a table,
+        the result is remembered for the pair of blocks.
+
+        """
+        sequence = self._in_sequence(baseline_block.text)
+        if sequence:
+            lookup = (self._sequence_search if templated
+                      else self._sequence_lookup)
+            args = (baseline_block, comparison_block)
+        else:
+            lookup = self._child_lookup
+            args = (baseline_block, comparison_block, templated)
+        if self.table is None or not comparison_block.children:
+            return lookup(*args)
+        return self.table.result(
+            (baseline_block, comparison_block, sequence, self.ordered),
+            lookup, *args)
+
+    @staticmethod
+    def _sequence_lookup(baseline_block, comparison_block):
+        """Lines nested beneath a pair of matching blocks, in order.
+
+        Each child, with the lines nested beneath it, is given an
+        integer ID by its digest, and the IDs are compared with a
+        shortest edit script, so a child out of order is both
+        missing and additional.
+
+        """
+        baseline_children = baseline_block.children
+        comparison_children = comparison_block.children
+        ids = {}
+        deleted, inserted = edit_script(
+            [ids.setdefault(c.digest, len(ids)) for c in baseline_children],
+            [ids.setdefault(c.digest, len(ids)) for c in comparison_children])
+        return ChildComparison(
+            [line for i in inserted for line in comparison_children[i].lines()],
+            [line for i in deleted for line in baseline_children[i].lines()])
+
+    def _child_count(self, baseline_block, comparison_block, stop=False,
+                     templated=False):
+        """Count the lines _child_lookup would give, without listing them.
+
+        When stop is True, counting stops at the first missing line.
+
+        """
+        comparison_children = comparison_block.children
+        pair = self._pair_templates if templated else self._pair_children
+        pairs, matched = pair(baseline_block, comparison_block)
+        missing, nested_additional = 0, {}
+        for baseline_child, i in pairs:
+            if i is None:
+                missing += len(baseline_child)
             else:
-                missing.append(child_target)
-        return ChildComparison(comparison_children, sorted(missing))
+                comparison_child = comparison_children[i]
+                if baseline_child.digest == comparison_child.digest:
+                    continue
+                if baseline_child.children or comparison_child.children:
+                    nested = self._child_count(baseline_child,
+                                               comparison_child, stop,
+                                               templated)
+                    if nested.missing:
+                        missing += 1 + nested.missing
+                    nested_additional[i] = nested.additional
+            if stop and missing:
+                return ChildComparison(0, missing)
+        additional = 0
+        for i, comparison_child in enumerate(comparison_children):
+            if not matched[i]:
+                additional += len(comparison_child)
+            elif nested_additional.get(i):
+                additional += 1 + nested_additional[i]
+        return ChildComparison(additional, missing)
+
+    def _block_count(self, baseline_block, comparison_block, stop,
+                     templated=False):
+        if self._in_sequence(baseline_block.text):
+            lookup = self._block_lookup(baseline_block, comparison_block,
+                                        templated)
+            return ChildComparison(len(lookup.additional), len(lookup.missing))
+        return self._child_count(baseline_block, comparison_block, stop,
+                                 templated)
+
+    def _sequence_search(self, baseline_block, comparison_block):
+        """Lines nested beneath a templated block and its config block, in order.
+
+        Each config child is given the ID of the child line of the
+        baseline block it matches, trying the child lines with the
+        most literal text first, and the IDs are compared with a
+        shortest edit script.
 
-    def _binary_search(self, target, search_array):
-        if not search_array:
+        """
+        pattern, targets = self.baseline.children(baseline_block)
+        ids = dict((line, i) for i, line in enumerate(targets))
+        baseline_children = baseline_block.children
+        comparison_children = comparison_block.children
+        comparison_ids = []
+        for i, comparison_child in enumerate(comparison_children):
+            match = pattern.match(comparison_child.text) if pattern else None
+            comparison_ids.append(int(match.lastgroup[1:]) if match
+                                  else -1 - i)
+        if self.stats is not None and pattern:
+            self.stats.count('template_matches', len(comparison_children))
+        deleted, inserted = edit_script(
+            [ids[child.text] for child in baseline_children], comparison_ids)
+        return ChildComparison(
+            [line for i in inserted for line in comparison_children[i].lines()],
+            [line for i in deleted for line in baseline_children[i].lines()])
+
+    @staticmethod
+    def _literal_prefix(target):
+        prefix = target.split(diffios.DELIMITER_START, 1)[0]
+        if any(m in prefix for m in diffios.UNESCAPED_METACHARACTERS):
             return None
-        sorted_array = sorted(search_array)
-        low = 0
-        high = len(sorted_array) - 1
-        while low <= high:
-            mid = (high + low) // 2
-            guess = sorted_array[mid]
-            compare_lines = self._compare_lines(target, guess)
-            if compare_lines:
-                return guess
-            if target < guess:
-                high = mid - 1
-            else:
-                low = mid + 1
+        return prefix
+
+    @staticmethod
+    def _parent_index(comparison):
+        """Index the comparison parents by their first word.
+
+        Parents are tried in sorted order whether or not the
+        differences are ordered, so that both find the same parent.
+
+        """
+        parents = sorted(comparison)
+        index = {None: parents}
+        for parent in parents:
+            words = parent.split(None, 1)
+            if words:
+                index.setdefault(words[0], []).append(parent)
+        return index
+
+    def _parent_search(self, target, comparison, index):
+        """Find the comparison parent matching a baseline parent.
+
+        Only comparison parents starting with the literal text
+        before the first variable of the target are tried, found
+        by their first word, unless the first word of the target
+        contains a variable.
+
+        """
+        prefix = self._literal_prefix(target)
+        if prefix == target:
+            return target if target in comparison else None
+        words = prefix.split(None, 1) if prefix else []
+        if len(words) > 1 or (words and prefix[-1].isspace()):
+            candidates = index.get(words[0], [])
+        else:
+            candidates = index[None]
+        for candidate in candidates:
+            if (candidate in comparison and
+                    (prefix is None or candidate.startswith(prefix)) and
+                    self._compare_lines(target, candidate)):
+                return candidate
         return None
 
     def _hash_lookup(self, baseline, comparison):
-        missing, additional, with_vars = [], [], []
+        missing, additional = [], []
+        with_vars = list(self.baseline.template_blocks())
         while not baseline.empty():
-            baseline_group = baseline.get()
+            baseline_group, baseline_block = baseline.get()
             baseline_parent = baseline_group[0]
-            baseline_children = baseline_group[1:]
-            baseline_family = ' '.join(baseline_group)
-            if diffios.DELIMITER_START in baseline_family:
-                with_vars.append(baseline_group)
-            else:
-                comparison_children = comparison.pop(baseline_parent, -1)
-                if comparison_children == -1:
-                    missing.append(baseline_group)
-                elif comparison_children:
-                    child_lookup = self._child_lookup(baseline_parent,
-                                                      baseline_children,
-                                                      comparison_children)
-                    if child_lookup.additional:
-                        additional.append(child_lookup.additional)
-                    if child_lookup.missing:
-                        missing.append(child_lookup.missing)
+            comparison_block = comparison.pop(baseline_parent, None)
+            if comparison_block is None:
+                missing.append(baseline_group)
+            elif self._unchanged(baseline_block, comparison_block):
+                continue
+            elif comparison_block.children:
+                child_lookup = self._block_lookup(baseline_block,
+                                                  comparison_block)
+                if child_lookup.additional:
+                    additional.append([baseline_parent] +
+                                      child_lookup.additional)
+                if child_lookup.missing:
+                    missing.append([baseline_parent] + child_lookup.missing)
         return (missing, additional, with_vars)
 
+    @staticmethod
+    def _positions(config):
+        positions = {}
+        for block in config.blocks():
+            positions.setdefault(block.text, len(positions))
+        return positions
+
+    @staticmethod
+    def _in_order(groups, positions):
+        """Put groups back in config order, without sorting.
+
+        Each group is placed in a slot by the position of its
+        parent line in the config, so repeated parent lines keep
+        the order they were found in.
+
+        """
+        slots = [[] for _ in range(len(positions))]
+        for group in groups:
+            slots[positions[group[0]]].append(group)
+        return [group for slot in slots for group in slot]
+
+    def _template_order(self, templates):
+        """Templated blocks in the order their parents are searched for.
+
+        Blocks with a parent line containing no variables, templated
+        only by their children, come first, so a templated parent
+        such as 'interface Gi0/{{ N }}' cannot claim the config
+        parent they match exactly.
+
+        """
+        exact, templated = [], []
+        for group, block in reversed(templates):
+            if self._literal_prefix(block.text) == block.text:
+                exact.append((group, block))
+            else:
+                templated.append((group, block))
+        return exact + templated
+
     def _with_vars_search(self, with_vars, comparison, missing, additional):
-        while with_vars:
-            target = with_vars.pop()
+        index = self._parent_index(comparison)
+        for target, block in self._template_order(with_vars):
             target_parent = target[0]
-            target_children = sorted(target[1:])
-            parent_search = self._binary_search(target_parent,
-                                                comparison.keys())
+            parent_search = self._parent_search(target_parent, comparison,
+                                                index)
             if parent_search:
-                comparison_children = sorted(comparison.pop(parent_search))
-                child_search = self._child_search(target_children,
-                                                  comparison_children)
+                child_search = self._block_lookup(
+                    block, comparison.pop(parent_search), templated=True)
                 if child_search.additional:
                     additional.append([parent_search] +
                                       child_search.additional)
@@ -235,16 +556,161 @@ class Compare(object):
                 missing.append(target)
         return (missing, additional)
 
+    def _same(self):
+        self.baseline.blocks()  # parse both configs before timing digests
+        blocks = self.comparison.blocks()
+        if self.stats is not None:
+            self.stats.count('comparison_lines',
+                             sum(len(block) for block in blocks))
+        with phase(self.stats, 'digest'):
+            same = self.baseline.digest() == self.comparison.digest()
+        # digests do not depend on order, so cannot tell sequences apart
+        return same and not (self._sequence_matcher is not None and any(
+            self._in_sequence(block.text) for block in self.baseline.blocks()))
+
     def _search(self):
+        if self._same():
+            return diffios.DiffResult([], [])
         baseline = self._baseline_queue()
         comparison = self._comparison_hash()
-        missing, additional, with_vars = self._hash_lookup(baseline,
-                                                           comparison)
-        missing, additional = self._with_vars_search(with_vars, comparison,
-                                                     missing, additional)
-        additional = sorted([[k] + v
-                             for k, v in comparison.items()] + additional)
-        return {'missing': missing, 'additional': additional}
+        with phase(self.stats, 'hash_lookup'):
+            missing, additional, with_vars = self._hash_lookup(baseline,
+                                                               comparison)
+        with phase(self.stats, 'with_vars_search'), counting(
+                self.stats, 'template_matches', self, '_compare_lines'):
+            missing, additional = self._with_vars_search(
+                with_vars, comparison, missing, additional)
+        additional += [block.lines() for block in comparison.values()]
+        with phase(self.stats, 'order'):
+            if self.ordered:
+                missing = self._in_order(missing,
+                                         self._positions(self.baseline))
+                additional = self._in_order(
+                    additional, self._positions(self.comparison))
+            else:
+                missing.sort()
+                additional.sort()
+        return diffios.DiffResult(missing, additional)
+
+    def _count(self, stop=False):
+        """Count the groups and lines _search would give.
+
+        The same blocks are matched as by _search, but only the
+        size of each difference is kept. When stop is True, counting
+        stops at the first missing group.
+
+        """
+        counts = [0, 0, 0, 0]
+        if self._same():
+            return Summary(*counts)
+        literals = self.baseline.literals()
+        comparison = self._comparison_hash()
+        with phase(self.stats, 'count'), counting(
+                self.stats, 'template_matches', self, '_compare_lines'):
+            return self._count_blocks(literals, comparison, counts, stop)
+
+    def _count_blocks(self, literals, comparison, counts, stop):
+        def count(lines, offset):
+            if lines:
+                counts[offset] += 1
+                counts[offset + 1] += lines
+
+        for baseline_group, baseline_block in literals:
+            comparison_block = comparison.pop(baseline_group[0], None)
+            if comparison_block is None:
+                count(len(baseline_group), 0)
+            elif self._unchanged(baseline_block, comparison_block):
+                continue
+            elif comparison_block.children:
+                child_count = self._block_count(baseline_block,
+                                                comparison_block, stop)
+                count(child_count.additional and 1 + child_count.additional, 2)
+                count(child_count.missing and 1 + child_count.missing, 0)
+            if stop and counts[0]:
+                return Summary(*counts)
+        index = self._parent_index(comparison)
+        for target, block in self._template_order(
+                self.baseline.template_blocks()):
+            parent_search = self._parent_search(target[0], comparison, index)
+            if parent_search:
+                child_count = self._block_count(
+                    block, comparison.pop(parent_search), stop, templated=True)
+                count(child_count.additional and 1 + child_count.additional, 2)
+                count(child_count.missing and 1 + child_count.missing, 0)
+            else:
+                count(len(target), 0)
+            if stop and counts[0]:
+                return Summary(*counts)
+        for block in comparison.values():
+            count(len(block), 2)
+        return Summary(*counts)
+
+    def summary(self):
+        """Count the differences of the comparison against the baseline.
+
+        The differing blocks are matched as for missing() and
+        additional(), but only counted, so no lists of lines are
+        built or sorted.
+
+        Returns:
+            Summary: Number of missing groups and lines, and number
+                of additional groups and lines
+
+        >>> diff = Compare(['interface Vlan1', ' no shutdown'],
+        ...                ['interface Vlan1', ' shutdown', 'end'], [])
+        >>> diff.summary()
+        Summary(missing_groups=1, missing_lines=2, additional_groups=2, \
+additional_lines=3)
+
+        """
+        if self._result is not None:
+            missing = self._result.missing
+            additional = self._result.additional
+            return Summary(len(missing), sum(len(g) for g in missing),
+                           len(additional), sum(len(g) for g in additional))
+        return self._count()
+
+    def is_compliant(self, strict=False):
+        """Whether the comparison contains every line of the baseline.
+
+        Checking stops at the first missing line, so this is faster
+        than checking missing() for a config that is not compliant.
+
+        Kwargs:
+            strict (bool): Also require the comparison to have no
+                additional lines. Defaults to False.
+
+        Returns:
+            bool: True if no lines are missing from the comparison
+
+        >>> diff = Compare(['hostname R1'], ['hostname R1', 'end'], [])
+        >>> diff.is_compliant()
+        True
+        >>> diff.is_compliant(strict=True)
+        False
+
+        """
+        if self._result is not None:
+            summary = self.summary()
+        else:
+            summary = self._count(stop=True)
+        if strict:
+            return not (summary.missing_lines or summary.additional_lines)
+        return not summary.missing_lines
+
+    def result(self):
+        """The diff of the comparison against the baseline.
+
+        The diff is computed the first time it is needed, and
+        shared by every other method of Compare.
+
+        Returns:
+            diffios.DiffResult: Missing and additional lines
+
+        """
+        if self._result is None:
+            self._result = self._search()
+        return self._result
 
     def additional(self):
         """Lines in the comparison config not present in baseline config.
@@ -262,10 +728,11 @@ class Compare(object):
              no shutdown                            # Child
 
         Returns:
-            list: Sorted lines additional to the comparison config.
+            list: Lines additional to the comparison config, sorted,
+                or in config order if ordered.
 
         """
-        return sorted(self._search()['additional'])
+        return self.result().additional
 
     def missing(self):
         """Lines in the baseline config not present in comparison config.
@@ -283,27 +750,32 @@ class Compare(object):
              no shutdown                            # Child
 
         Returns:
-            list: Sorted lines missing from the comparison config.
+            list: Lines missing from the comparison config, sorted,
+                or in config order if ordered.
 
         """
-        return sorted(self._search()['missing'])
+        return self.result().missing
 
-    @staticmethod
-    def _pprint_format(data, prefix):
-        deltas = ""
-        for i, group in enumerate(data, 1):
-            deltas += "\n{} {:>3}: {}".format(prefix, i, group[0])
-            if len(group) > 1:
-                deltas += "\n{}      {}".format(
-                    prefix, "\n{}      ".format(prefix).join(group[1:]))
-        return deltas
+    def write_delta(self, fp):
+        """Write a human readable diff to a file object.
+
+        The diff is written as it is formatted, one group at a
+        time, so that it is never held in memory as a whole.
+
+        Args:
+            fp (file): File, socket file or other object with a
+                write() method, open for writing text
+
+        """
+        self.result().write_delta(fp)
 
     def delta(self):
         """A human readable diff of the comparison against the baseline.
 
         A human readable string of the diff. Missing lines are
         prefixed with a '-', additional lines are prefixed with
-        a '+'. Each hierarchical grouping is numbered.
+        a '+'. Each hierarchical grouping is numbered. Use
+        write_delta() to write the diff straight to a file.
 
         Example:
             --- baseline
@@ -322,17 +794,29 @@ class Compare(object):
             string: Detail of the diff of comparison against baseline.
 
         """
-        missing = self._pprint_format(self.missing(), '-')
-        additional = self._pprint_format(self.additional(), '+')
-        return ("--- baseline\n"
-                "+++ comparison"
-                "\n{0}"
-                "\n{1}"
-                "\n").format(missing, additional)
+        fp = StringIO()
+        self.write_delta(fp)
+        return fp.getvalue()
 
-    @staticmethod
-    def _format_changes(data):
-        return "\n\n".join("\n".join(lines) for lines in data)
+    def write_additional(self, fp):
+        """Write the pretty print format of additional lines to a file object.
+
+        Args:
+            fp (file): File, socket file or other object with a
+                write() method, open for writing text
+
+        """
+        self.result().write_additional(fp)
+
+    def write_missing(self, fp):
+        """Write the pretty print format of missing lines to a file object.
+
+        Args:
+            fp (file): File, socket file or other object with a
+                write() method, open for writing text
+
+        """
+        self.result().write_missing(fp)
 
     def pprint_additional(self):
         """A pretty print format of additional lines
@@ -350,7 +834,9 @@ class Compare(object):
             string: Pretty print formatted output
 
         """
-        return self._format_changes(self.additional())
+        fp = StringIO()
+        self.write_additional(fp)
+        return fp.getvalue()
 
     def pprint_missing(self):
         """A pretty print format of missing lines
@@ -367,4 +853,6 @@ class Compare(object):
             string: Pretty print formatted output
 
         """
-        return self._format_changes(self.missing())
+        fp = StringIO()
+        self.write_missing(fp)
+        return fp.getvalue()
@@ -8,33 +8,70 @@ Github: https://github.com/robphoenix
 Description: Prepare Cisco IOS configs for comparison
 
 """
+import io
+import mmap
 import os
 import re
 from collections import namedtuple
 
 import diffios
+from diffios.stats import counting, phase
+
+Partition = namedtuple("Partition", "ignored included blocks")
+
+WHITESPACE = b' \t\r\n\x0b\x0c'
+NON_ASCII = re.compile(b'[\x80-\xff]')
+
+try:
+    string_types = basestring
+except NameError:
+    string_types = str
 
 
 class Config(object):
     """Config prepares a Cisco IOS Config to diff.
 
-    Config takes a Cisco IOS config, as a file or a
-    list, removes any invalid lines, such as comments,
-    breaks the config into a hierarchical block structure
-    and partitions the config according to a list of
-    lines to ignore.
+    Config takes a Cisco IOS config, as a file, a list or
+    any iterable of lines, removes any invalid lines, such as
+    comments, breaks the config into a hierarchical block
+    structure and partitions the config according to a list
+    of lines to ignore.
+
+    When the config is a file or an iterable, such as an open
+    file, sys.stdin or a generator, lines are validated and
+    grouped as they are read, without first reading the whole
+    config into memory.
 
     Attributes:
-        config (list): List of valid config lines
+        config (list): List of config lines
         ignore_lines (list): List of lines to ignore
+        ordered (bool): Whether blocks are kept in config order
+        stats (diffios.Stats): Stats recording the time of each
+            phase, or None
+        table (diffios.BlockTable): Table sharing blocks with
+            other configs, or None
 
     Args:
-        config (str|list): Path to config file, or list
-            containing lines of config
+        config (str|list|iterable): Path to config file, list
+            containing lines of config, or iterable yielding
+            lines of config
 
     Kwargs:
-        ignore_lines (str|list): Path to ignores file, or list
-            containing lines to ignore. Defaults to empty list.
+        ignore_lines (str|list|iterable|diffios.IgnoreMatcher): Path
+            to ignores file, list or iterable containing lines to
+            ignore, or an already compiled diffios.IgnoreMatcher.
+            Defaults to empty list.
+        cache (diffios.ConfigCache): Cache of parsed configs.
+            When config is a path, the parsed config is loaded
+            from, or stored in, the cache. Defaults to no cache.
+        ordered (bool): Keep blocks in the order they appear in
+            the config, rather than sorting them. Defaults to False.
+        stats (diffios.Stats): Stats to record the time of each
+            phase of parsing the config in. Defaults to None,
+            recording nothing.
+        table (diffios.BlockTable): Table to share identical
+            blocks with the other configs of a batch through.
+            Defaults to None, sharing nothing.
 
     >>> config = [
     ... '!',
@@ -59,57 +96,328 @@ class Config(object):
 
     """
 
-    def __init__(self, config, ignore_lines=None):
-        self.config = self._check_data('config', config)
+    def __init__(self, config, ignore_lines=None, cache=None, ordered=False,
+                 stats=None, table=None):
+        self.ordered = ordered
+        self.stats = stats
+        self.table = table
         if ignore_lines is None:
             ignore_lines = []
-        self.ignore_lines = self._ignore(
-            self._check_data('ignore_lines', ignore_lines))
+        if isinstance(ignore_lines, diffios.IgnoreMatcher):
+            self.ignore_lines = ignore_lines
+        else:
+            self.ignore_lines = self._ignore(
+                self._check_data('ignore_lines', ignore_lines))
+        cache_key = None
+        if cache is not None and isinstance(config, string_types):
+            with phase(self.stats, 'cache'):
+                cache_key = self._cache_key(cache, config)
+                cached = cache.get(cache_key)
+            if cached is not None:
+                self._load_cached(config, *cached)
+                return
+        config = self._check_data('config', config)
+        if isinstance(config, list):
+            self.config = config
+        else:
+            self.config = []
+            with phase(self.stats, 'read'):
+                self._groups = self._sort_blocks(
+                    self._build_blocks(self._stream(config)))
+        if cache_key is not None:
+            partition = self._partition_config()
+            with phase(self.stats, 'cache'):
+                cache.put(cache_key, partition.ignored, partition.blocks)
+
+    def _cache_key(self, cache, path):
+        try:
+            return cache.key(path, self.ignore_lines, self.ordered)
+        except IOError:
+            raise RuntimeError(
+                "diffios.Config() could not open '{}'".format(path))
+
+    def _load_cached(self, path, ignored, blocks):
+        self.config = None
+        self._path = path
+        self._encoding = None
+        self._partition = self._share(
+            Partition(ignored, [b.lines() for b in blocks], blocks))
+
+    @classmethod
+    def from_mmap(cls, path, ignore_lines=None, encoding='utf-8',
+                  ordered=False, stats=None, table=None):
+        """Create a diffios.Config from a memory-mapped config file.
+
+        Intended for very large configs. Line boundaries,
+        indentation, invalid lines and lines to ignore are all
+        found directly on the bytes of the file, and only lines
+        that are included, or that contain characters other than
+        ASCII, are decoded. Lines with other characters are matched
+        against the lines to ignore once decoded, as case is only
+        ignored for ASCII on bytes. The config attribute and
+        ignored() read the file again, the first time they are
+        used.
+
+        Args:
+            path (str): Path to config file
+
+        Kwargs:
+            ignore_lines (str|list|iterable): Path to ignores file,
+                list or iterable containing lines to ignore.
+            encoding (str): Encoding of the config file.
+                Defaults to utf-8.
+            ordered (bool): Keep blocks in the order they appear in
+                the config. Defaults to False.
+            stats (diffios.Stats): Stats to record the time of each
+                phase in. Defaults to None.
+            table (diffios.BlockTable): Table to share identical
+                blocks through. Defaults to None.
+
+        Returns:
+            diffios.Config: Config with its included lines loaded
+
+        """
+        conf = cls([], ignore_lines, ordered=ordered, stats=stats,
+                   table=table)
+        conf._config = None
+        conf._path = path
+        conf._encoding = encoding
+        try:
+            with open(path, 'rb') as fin:
+                try:
+                    mapped = mmap.mmap(
+                        fin.fileno(), 0, access=mmap.ACCESS_READ)
+                except ValueError:  # cannot map an empty file
+                    conf._partition = Partition(None, [], [])
+                    return conf
+        except IOError:
+            raise RuntimeError(
+                "diffios.Config() could not open '{}'".format(path))
+        try:
+            with phase(stats, 'read'):
+                blocks = conf._sort_blocks(
+                    conf._build_blocks(conf._map_included(mapped, encoding)))
+        except UnicodeDecodeError:
+            raise RuntimeError(
+                "diffios.Config() received an invalid argument: "
+                "config={}\n".format(path))
+        finally:
+            mapped.close()
+        conf._partition = conf._share(
+            Partition(None, [b.lines() for b in blocks], blocks))
+        return conf
+
+    def _map_included(self, mapped, encoding):
+        ignore = self._ignore_matcher.bytes_pattern(encoding)
+        non_ascii = ignore is not None and NON_ASCII.search(mapped) is not None
+        skip, started = None, False
+        pos, size = 0, len(mapped)
+        while pos < size:
+            end = mapped.find(b'\n', pos)
+            if end == -1:
+                end = size
+            start, stop, pos = pos, end, end + 1
+            while stop > start and mapped[stop - 1:stop] in WHITESPACE:
+                stop -= 1
+            first = start
+            while first < stop and mapped[first:first + 1] in WHITESPACE:
+                first += 1
+            if (first == stop or mapped[first:first + 1] == b'!' or
+                    mapped[first:stop] in (b'^', b'^C')):
+                continue
+            indent = first - start if started else 0
+            started = True
+            if skip is not None and indent > skip:
+                continue  # nested beneath an ignored line
+            skip = None
+            if ignore is None:
+                yield mapped[start:stop].decode(encoding)
+            elif non_ascii and NON_ASCII.search(mapped, start, stop):
+                line = mapped[start:stop].decode(encoding)
+                if self._ignore_line(line):
+                    skip = indent
+                    continue
+                yield line
+            elif ignore.search(mapped, start, stop) is None:
+                yield mapped[start:stop].decode(encoding)
+            else:
+                skip = indent
+
+    @property
+    def config(self):
+        """List of config lines, as given."""
+        if self._config is None:
+            fin = io.open(self._path, encoding=self._encoding)
+            self._config = [line.rstrip('\r\n') for line in
+                            self._read(fin, 'config', self._path)]
+        return self._config
+
+    @config.setter
+    def config(self, config):
+        self._config = config
+        self._valid = None
+        self._groups = None
+        self._partition = None
+
+    @property
+    def ignore_lines(self):
+        """List of lines to ignore."""
+        return self._ignore_lines
+
+    @ignore_lines.setter
+    def ignore_lines(self, ignore_lines):
+        if isinstance(ignore_lines, diffios.IgnoreMatcher):
+            self._ignore_matcher = ignore_lines
+            ignore_lines = ignore_lines.ignore_lines
+        else:
+            self._ignore_matcher = diffios.IgnoreMatcher(ignore_lines)
+        self._ignore_lines = ignore_lines
+        self._partition = None
+
+    def _stream(self, lines):
+        for line in lines:
+            line = line.rstrip('\r\n')
+            self._config.append(line)
+            if self._valid_line(line):
+                yield line.rstrip()
 
     def _valid_config(self):
-        return [l.rstrip() for l in self.config if self._valid_line(l)]
+        if self._valid is None:
+            config = self.config
+            with phase(self.stats, 'validate'):
+                self._valid = [
+                    l.rstrip() for l in config if self._valid_line(l)
+                ]
+        return self._valid
 
     def _group_config(self):
-        current_group, groups = [], []
-        for line in self._valid_config():
-            if not line.startswith(' ') and current_group:
-                groups.append(current_group)
-                current_group = [line]
-            else:
-                current_group.append(line)
-        if current_group:
-            groups.append(current_group)
-        return sorted(groups)
-
-    def _partition_group(self, group):
-        Partition = namedtuple("Partition", "ignored included")
-        ignored, included = [], []
-        for i, line in enumerate(group):
-            if self._ignore_line(line) and i == 0:
-                return Partition(group, included)
-            elif self._ignore_line(line):
-                ignored.append(line)
+        if self._groups is None:
+            valid = self._valid_config()
+            with phase(self.stats, 'group'):
+                self._groups = self._sort_blocks(self._build_blocks(valid))
+        return self._groups
+
+    @staticmethod
+    def _build_blocks(lines):
+        blocks, stack = [], []
+        for line in lines:
+            indent = len(line) - len(line.lstrip())
+            node = diffios.Node(line)
+            while len(stack) > 1 and stack[-1][0] >= indent:
+                stack.pop()
+            if stack and indent > 0:
+                stack[-1][1].add(node)
             else:
-                included.append(line)
-        return Partition(ignored, included)
+                blocks.append(node)
+                stack = []
+            stack.append((indent, node))
+        return blocks
+
+    def _sort_blocks(self, blocks):
+        if self.ordered:
+            return blocks
+        return sorted(blocks, key=diffios.Node.lines)
+
+    def _partition_block(self, block, ignored):
+        if self._ignore_line(block.text):
+            ignored.extend(block.lines())
+            return None
+        children = []
+        for child in block.children:
+            included = self._partition_block(child, ignored)
+            if included is not None:
+                children.append(included)
+        if (len(children) == len(block.children) and
+                all(a is b for a, b in zip(children, block.children))):
+            return block
+        return diffios.Node(block.text, children)
 
     def _partition_config(self):
-        Partition = namedtuple("Partition", "ignored included")
-        included, ignored = [], []
-        for group in self._group_config():
-            partition = self._partition_group(group)
-            if partition.included:
-                included.append(partition.included)
-            if partition.ignored:
-                ignored.append(partition.ignored)
-        return Partition(ignored, included)
+        if self._partition is None:
+            groups = self._group_config()
+            with phase(self.stats, 'partition'), counting(
+                    self.stats, 'ignore_searches', self, '_ignore_line'):
+                partition = self._partition_groups(groups)
+            self._partition = self._share(partition)
+        return self._partition
+
+    def _share(self, partition):
+        if self.table is None:
+            return partition
+        with phase(self.stats, 'intern'):
+            blocks = [self.table.intern(block) for block in partition.blocks]
+        return partition._replace(blocks=blocks)
+
+    def _partition_groups(self, groups):
+        included, ignored, blocks = [], [], []
+        for group in groups:
+            ignored_lines = []
+            block = self._partition_block(group, ignored_lines)
+            if block is not None:
+                blocks.append(block)
+                included.append(block.lines())
+            if ignored_lines:
+                ignored.append(ignored_lines)
+        if not self.ordered:
+            # sort by the included lines, as from_mmap does
+            order = sorted(range(len(blocks)), key=included.__getitem__)
+            included = [included[i] for i in order]
+            blocks = [blocks[i] for i in order]
+        return Partition(ignored, included, blocks)
 
     def included(self):
-        """Lines from the original config that are not ignored. """
+        """Lines from the original config that are not ignored.
+
+        The config is grouped and partitioned the first time either
+        included() or ignored() is called, and the result is reused
+        until config or ignore_lines is reassigned. The returned list
+        is shared, so copy it before modifying it.
+
+        """
         return self._partition_config().included
 
+    def blocks(self):
+        """Hierarchical blocks from the original config that are not ignored.
+
+        Each block is a diffios.Node, holding a top level line
+        of config and the lines nested beneath it, to any depth.
+        The blocks are in the same order as included(). When a
+        line is ignored, every line nested beneath it is also
+        ignored.
+
+        >>> conf = Config([
+        ... 'router bgp 65000',
+        ... ' address-family ipv4',
+        ... '  neighbor 10.0.0.1 activate',
+        ... ' exit-address-family'])
+        >>> [child.text for child in conf.blocks()[0].children]
+        [' address-family ipv4', ' exit-address-family']
+
+        """
+        return self._partition_config().blocks
+
+    def digest(self):
+        """Hash of the lines from the original config that are not ignored.
+
+        Two configs with the same digest have the same included
+        blocks, regardless of the order of the blocks or the order
+        of the lines within them.
+
+        Returns:
+            bytes: SHA-1 digest
+
+        """
+        return diffios.Node.combine(
+            '', (block.digest for block in self.blocks()))
+
     def ignored(self):
-        """Lines from the original config that are ignored. """
+        """Lines from the original config that are ignored.
+
+        Shares the cached partition used by included().
+
+        """
+        if self._partition_config().ignored is None:
+            self._partition = None
         return self._partition_config().ignored
 
     @staticmethod
@@ -122,13 +430,30 @@ class Config(object):
         unable_to_open = "diffios.Config() could not open '{}'"
         if isinstance(data, list):
             return data
+        if isinstance(data, dict):
+            raise RuntimeError(invalid_arg.format(name, data))
         try:
-            with open(data) as fin:
-                return fin.read().splitlines()  # remove '\n' from lines
+            fin = open(data)
         except IOError:
             raise RuntimeError((unable_to_open.format(data)))
+        except TypeError:
+            try:
+                return iter(data)
+            except TypeError:
+                raise RuntimeError(invalid_arg.format(name, data))
         except:
             raise RuntimeError(invalid_arg.format(name, data))
+        return Config._read(fin, name, data)
+
+    @staticmethod
+    def _read(fin, name, data):
+        invalid_arg = "diffios.Config() received an invalid argument: {}={}\n"
+        with fin:
+            try:
+                for line in fin:
+                    yield line
+            except (IOError, OSError, UnicodeDecodeError):
+                raise RuntimeError(invalid_arg.format(name, data))
 
     @staticmethod
     def _valid_line(line):
@@ -137,11 +462,4 @@ class Config(object):
             "!") and line != '^' and line != '^C'
 
     def _ignore_line(self, line):
-        for line_to_ignore in self.ignore_lines:
-            for metacharacter in diffios.REGEX_METACHARACTERS:
-                if metacharacter in line_to_ignore:
-                    line_to_ignore = line_to_ignore.replace(
-                        metacharacter, '\{}'.format(metacharacter))
-            if re.search(line_to_ignore, line.lower()):
-                return True
-        return False
+        return self._ignore_matcher.search(line)
@@ -3,3 +3,23 @@ DELIMITER_START = '{{'
 DELIMITER_END = '}}'
 
 REGEX_METACHARACTERS = ['*', '+', '.', '?']
+
+# Metacharacters that are not escaped in baseline or ignore lines
+UNESCAPED_METACHARACTERS = ['\\', '^', '$', '|', '(', ')', '[', ']', '{', '}']
+
+# Patterns for typed variables, such as {{ VLAN:int }} or {{ IP:ipv4 }}
+IPV4_OCTET = r'(?:25[0-5]|2[0-4][0-9]|1[0-9][0-9]|[1-9]?[0-9])'
+IPV4 = r'{0}(?:\.{0}){{3}}'.format(IPV4_OCTET)
+IPV4_MASKS = [
+    '.'.join(str((0xffffffff << (32 - bits) >> shift) & 0xff)
+             for shift in (24, 16, 8, 0))
+    for bits in range(32, -1, -1)
+]
+VARIABLE_TYPES = {
+    'int': r'[0-9]+',
+    'word': r'\S+',
+    'ipv4': IPV4,
+    'ipv4mask': '|'.join(m.replace('.', r'\.') for m in IPV4_MASKS),
+    'ipv4prefix': IPV4 + r'/(?:3[0-2]|[12]?[0-9])',
+    'rest': r'.+',
+}
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+File: fleet.py
+Author: Rob Phoenix
+Email: rob@robphoenix.com
+Github: https://github.com/robphoenix
+Description: Compare many Cisco IOS configs against a baseline in parallel
+
+"""
+import multiprocessing
+import os
+
+import diffios
+from diffios.stats import phase
+
+_worker = None  # baseline, whether to record stats, table and keep_going
+
+
+def _init_worker(baseline, measured, table, keep_going):
+    global _worker
+    _worker = (baseline, measured, table, keep_going)
+
+
+def _measure(config, baseline, measured, table, keep_going=False):
+    stats = diffios.Stats() if measured else None
+    try:
+        with phase(stats, 'device'):
+            result = baseline.compare(config, stats=stats,
+                                      table=table).result()
+    except Exception as e:
+        if not keep_going:
+            raise
+        return (config, e, None)
+    return (config, result, stats)
+
+
+def _compare(config):
+    return _measure(config, *_worker)
+
+
+def _by_size(configs):
+    def size(config):
+        try:
+            return os.path.getsize(config)
+        except (OSError, TypeError):
+            return 0
+    return sorted(configs, key=size, reverse=True)
+
+
+def compare_many(baseline, configs, ignore_lines=None, workers=None,
+                 chunksize=None, stats=None, metrics=None, table=None,
+                 keep_going=False):
+    """Compare many configs against a baseline, in parallel.
+
+    The baseline is compiled once, as a diffios.Baseline, and sent
+    to each worker process once, when the worker starts. Configs
+    are then shared out between the workers, and each result is
+    yielded as soon as it is ready, so results are not in the same
+    order as the configs.
+
+    Configs given as paths are compared largest first, in small
+    chunks, so that one large config at the end of a run does not
+    leave the other workers idle.
+
+    Args:
+        baseline (str|list|diffios.Config): Path to baseline config
+            file, list containing lines of config, or
+            diffios.Config object
+        configs (iterable): Paths to config files, or lists
+            containing lines of config, to compare
+
+    Kwargs:
+        ignore_lines (str|list): Path to ignores file, or list
+            containing lines to ignore. Not used if baseline is
+            already a diffios.Baseline. Defaults to empty list.
+        workers (int): Number of worker processes. Defaults to the
+            number of CPUs. With 1 worker, configs are compared in
+            the current process.
+        chunksize (int): Number of configs sent to a worker at a
+            time. Defaults to a size that gives each worker several
+            chunks.
+        stats (diffios.Stats): Stats to add the time of each phase
+            of every comparison to, including those in worker
+            processes. Defaults to None, recording nothing.
+        metrics (diffios.FleetMetrics): Metrics to record the
+            duration, line counts, group counts and regular
+            expression counts of each config in. Defaults to None.
+        table (diffios.BlockTable): Table to share identical blocks
+            through, so that blocks repeated across the configs are
+            only compared once. Each worker process is given its
+            own copy. Defaults to the table of the baseline, if any.
+        keep_going (bool): Carry on when a config cannot be read or
+            compared, yielding the exception raised in place of its
+            result, rather than stopping the run. Defaults to False.
+
+    Yields:
+        tuple: Each config, as given, and its diffios.DiffResult, or
+            the exception raised comparing it if keep_going is set
+
+    """
+    if not isinstance(baseline, diffios.Baseline):
+        if isinstance(baseline, diffios.Config):
+            baseline = diffios.Baseline.from_config(baseline)
+        else:
+            baseline = diffios.Baseline(baseline, ignore_lines, stats=stats,
+                                        table=table)
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+    measured = stats is not None or metrics is not None
+
+    def record(config, result, device_stats):
+        if device_stats is None:  # not measured, or failed
+            return (config, result)
+        if stats is not None:
+            stats.update(device_stats)
+        if metrics is not None:
+            metrics.record(config, result, device_stats)
+        return (config, result)
+
+    if workers <= 1:
+        for config in configs:
+            yield record(*_measure(config, baseline, measured, table,
+                                   keep_going))
+        return
+    configs = _by_size(configs)
+    if chunksize is None:
+        chunksize = max(1, len(configs) // (workers * 8))
+    pool = multiprocessing.Pool(workers, _init_worker,
+                                (baseline, measured, table, keep_going))
+    try:
+        for measurement in pool.imap_unordered(_compare, configs, chunksize):
+            yield record(*measurement)
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
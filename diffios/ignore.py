@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+File: ignore.py
+Author: Rob Phoenix
+Email: rob@robphoenix.com
+Github: https://github.com/robphoenix
+Description: Compile lines to ignore into a single matcher
+
+"""
+import re
+
+import diffios
+
+
+class IgnoreMatcher(object):
+    """IgnoreMatcher tests config lines against a list of lines to ignore.
+
+    Each line to ignore is treated as a case insensitive regular
+    expression, with any regex metacharacters in
+    diffios.REGEX_METACHARACTERS escaped. Most lines to ignore are
+    not really regular expressions though, so they are sorted into
+    three kinds when the matcher is created:
+
+    - anchored prefixes, such as '^ description', which are indexed
+      by their first word, so that a config line is only tested
+      against the prefixes that could start it
+    - plain substrings, such as 'hostname', which are tested with in
+    - true regular expressions, which are compiled once, into a
+      single alternation
+
+    A config line is ignored exactly when re.search would find one
+    of the lines to ignore in it.
+
+    Attributes:
+        ignore_lines (list): List of lines to ignore
+
+    Args:
+        ignore_lines (list): List of lowercase lines to ignore
+
+    >>> matcher = IgnoreMatcher(['hostname', '^ description', '*****'])
+    >>> matcher.search('hostname ROUTER')
+    True
+    >>> matcher.search(' Description *** Link to Core ***')
+    True
+    >>> matcher.search('interface FastEthernet0/1')
+    False
+    >>> matcher.search('! *****')
+    True
+    >>> matcher.search('interface Vlan1 description')
+    False
+
+    """
+
+    def __init__(self, ignore_lines):
+        self.ignore_lines = list(ignore_lines)
+        self._prefixes = {}
+        general_prefixes, self._substrings, regexes = [], [], []
+        for line in self.ignore_lines:
+            if self._literal(line):
+                self._substrings.append(line)
+            elif line.startswith('^') and self._literal(line[1:]):
+                prefix = line[1:]
+                words = prefix.split(None, 1)
+                if words:
+                    self._prefixes.setdefault(words[0], []).append(prefix)
+                else:
+                    general_prefixes.append(prefix)
+            else:
+                regexes.append(line)
+        self._prefixes = dict((word, tuple(prefixes))
+                              for word, prefixes in self._prefixes.items())
+        self._lengths = sorted(set(len(word) for word in self._prefixes))
+        self._general_prefixes = tuple(general_prefixes)
+        self._pattern = self._compile(regexes)
+
+    @staticmethod
+    def _literal(line_to_ignore):
+        return not any(metacharacter in line_to_ignore for metacharacter
+                       in diffios.UNESCAPED_METACHARACTERS)
+
+    @staticmethod
+    def _escape(line_to_ignore):
+        for metacharacter in diffios.REGEX_METACHARACTERS:
+            if metacharacter in line_to_ignore:
+                line_to_ignore = line_to_ignore.replace(
+                    metacharacter, '\\{}'.format(metacharacter))
+        return line_to_ignore
+
+    def _alternation(self, ignore_lines):
+        return '|'.join('(?:{})'.format(self._escape(line))
+                        for line in ignore_lines)
+
+    def _compile(self, ignore_lines):
+        if not ignore_lines:
+            return None
+        return re.compile(self._alternation(ignore_lines))
+
+    def bytes_pattern(self, encoding='utf-8'):
+        """Compile the lines to ignore for matching against raw bytes.
+
+        The pattern is case insensitive, in place of lowercasing
+        each line, and multiline, so that it can be searched
+        between the start and end offsets of a single line in a
+        larger buffer, such as a memory-mapped config file.
+
+        Case is only ignored for ASCII letters, so lines containing
+        other characters should be decoded and tested with search()
+        instead.
+
+        Kwargs:
+            encoding (str): Encoding of the config being searched
+
+        Returns:
+            re.RegexObject: Compiled pattern, or None if there are
+                no lines to ignore
+
+        """
+        if not self.ignore_lines:
+            return None
+        alternation = self._alternation(self.ignore_lines)
+        return re.compile(alternation.encode(encoding),
+                          re.IGNORECASE | re.MULTILINE)
+
+    def search(self, line):
+        """Whether the given line matches any of the lines to ignore.
+
+        Args:
+            line (str): Config line to test
+
+        Returns:
+            bool: True if the line should be ignored
+
+        """
+        line = line.lower()
+        if self._prefixes:
+            words = line.split(None, 1)
+            word = words[0] if words else ''
+            # a prefix matches only if its first word starts this word
+            for length in self._lengths:
+                if length > len(word):
+                    break
+                prefixes = self._prefixes.get(word[:length])
+                if prefixes is not None and line.startswith(prefixes):
+                    return True
+        if self._general_prefixes and line.startswith(self._general_prefixes):
+            return True
+        for substring in self._substrings:
+            if substring in line:
+                return True
+        return (self._pattern is not None and
+                self._pattern.search(line) is not None)
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+File: metrics.py
+Author: Rob Phoenix
+Email: rob@robphoenix.com
+Github: https://github.com/robphoenix
+Description: Export metrics of comparing a fleet of Cisco IOS configs
+
+"""
+import json
+import math
+import os
+import tempfile
+import timeit
+
+import diffios
+from diffios.cache import replace
+from diffios.config import string_types
+from diffios.stats import phase
+
+QUANTILES = (0.5, 0.9, 0.99)
+
+DEVICE_METRICS = [
+    ('duration_seconds', 'Time taken to compare the config.'),
+    ('lines', 'Included lines of the config.'),
+    ('missing_groups', 'Groups of lines missing from the config.'),
+    ('missing_lines', 'Lines missing from the config.'),
+    ('additional_groups', 'Groups of lines additional to the config.'),
+    ('additional_lines', 'Lines additional to the config.'),
+    ('regex_evaluations', 'Regular expressions evaluated for the config.'),
+]
+
+
+class FleetMetrics(object):
+    """FleetMetrics records metrics of a batch of comparisons.
+
+    For each config compared it records how long the comparison
+    took, the number of included lines of the config, the number
+    of missing and additional groups and lines, and the number of
+    regular expressions evaluated, meaning ignore rule searches and
+    template matches. The metrics, with the throughput of the
+    batch and quantiles of the durations, can be written as a
+    Prometheus textfile or as JSON.
+
+    Pass a FleetMetrics object to diffios.compare_many, or call
+    measure() for each config of a loop.
+
+    Attributes:
+        devices (list): Metrics of each config, as dicts, in the
+            order they were recorded
+
+    >>> metrics = FleetMetrics()
+    >>> baseline = diffios.Baseline(['hostname {{ hostname }}'])
+    >>> diff = metrics.measure(baseline, ['hostname R1', 'end'])
+    >>> device = metrics.devices[0]
+    >>> device['lines'], device['missing_lines'], device['additional_lines']
+    (2, 0, 1)
+
+    """
+
+    def __init__(self):
+        self.devices = []
+        self._start = timeit.default_timer()
+        self._end = self._start
+
+    def record(self, config, result, stats):
+        """Record the metrics of comparing a config.
+
+        Args:
+            config (str|list): Config compared, as given
+            result (diffios.DiffResult): Result of the comparison
+            stats (diffios.Stats): Stats of the comparison alone,
+                with its duration as the 'device' phase
+
+        """
+        self._end = timeit.default_timer()
+        counts = stats.counts
+        self.devices.append({
+            'device': self._name(config),
+            'duration_seconds': stats.times.get('device', 0.0),
+            'lines': counts.get('comparison_lines', 0),
+            'missing_groups': len(result.missing),
+            'missing_lines': sum(len(group) for group in result.missing),
+            'additional_groups': len(result.additional),
+            'additional_lines': sum(len(group)
+                                    for group in result.additional),
+            'regex_evaluations': (counts.get('ignore_searches', 0) +
+                                  counts.get('template_matches', 0)),
+        })
+
+    def measure(self, baseline, config):
+        """Compare a config against a baseline and record its metrics.
+
+        Args:
+            baseline (diffios.Baseline): Baseline to compare against
+            config (str|list|iterable): Config to compare
+
+        Returns:
+            diffios.Compare: Comparison of the config, with its
+                result already computed
+
+        """
+        stats = diffios.Stats()
+        with phase(stats, 'device'):
+            diff = baseline.compare(config, stats=stats)
+            result = diff.result()
+        self.record(config, result, stats)
+        return diff
+
+    def _name(self, config):
+        if isinstance(config, string_types):
+            return config
+        return '#{}'.format(len(self.devices) + 1)
+
+    def summary(self):
+        """Throughput and latency of the batch.
+
+        Returns:
+            dict: Number of configs, wall time of the batch, configs
+                compared per second and nearest-rank quantiles of the
+                durations
+
+        """
+        durations = sorted(d['duration_seconds'] for d in self.devices)
+        elapsed = self._end - self._start
+        quantiles = {}
+        for q in QUANTILES:
+            if durations:
+                rank = max(0, int(math.ceil(q * len(durations))) - 1)
+                quantiles[str(q)] = durations[rank]
+        return {
+            'devices': len(durations),
+            'duration_seconds': elapsed,
+            'devices_per_second': len(durations) / elapsed if elapsed else 0.0,
+            'device_duration_seconds_sum': sum(durations),
+            'device_duration_seconds': quantiles,
+        }
+
+    def write_json(self, fp):
+        """Write the summary and the metrics of each config as JSON.
+
+        Args:
+            fp (file): File object open for writing text
+
+        """
+        metrics = self.summary()
+        metrics['device'] = self.devices
+        fp.write(json.dumps(metrics, indent=2, sort_keys=True))
+        fp.write('\n')
+
+    def write_prometheus(self, fp, per_device=True):
+        """Write the metrics in the Prometheus text format.
+
+        Args:
+            fp (file): File object open for writing text
+
+        Kwargs:
+            per_device (bool): Write a sample of each metric for
+                each config, labelled by device. Defaults to True.
+
+        """
+        summary = self.summary()
+        for name, text, value in [
+                ('devices', 'Configs compared in the run.',
+                 summary['devices']),
+                ('run_duration_seconds', 'Wall time of the run.',
+                 summary['duration_seconds']),
+                ('devices_per_second', 'Configs compared per second.',
+                 summary['devices_per_second'])]:
+            self._write_metric(fp, name, 'gauge', text, [('', value)])
+        samples = [('{{quantile="{}"}}'.format(q), value) for q, value in
+                   sorted(summary['device_duration_seconds'].items())]
+        samples += [('_sum', summary['device_duration_seconds_sum']),
+                    ('_count', summary['devices'])]
+        self._write_metric(fp, 'device_duration_seconds', 'summary',
+                           'Time taken to compare each config.', samples)
+        if not per_device:
+            return
+        for name, text in DEVICE_METRICS:
+            samples = [('{{device="{}"}}'.format(self._label(d['device'])),
+                        d[name]) for d in self.devices]
+            self._write_metric(fp, 'config_' + name, 'gauge', text, samples)
+
+    @staticmethod
+    def _label(value):
+        return (value.replace('\\', '\\\\').replace('"', '\\"')
+                .replace('\n', '\\n'))
+
+    @staticmethod
+    def _write_metric(fp, name, kind, text, samples):
+        name = 'diffios_' + name
+        fp.write('# HELP {} {}\n# TYPE {} {}\n'.format(name, text, name, kind))
+        for suffix, value in samples:
+            fp.write('{}{} {!r}\n'.format(name, suffix, value))
+
+    def save(self, path):
+        """Write the metrics to a file.
+
+        The metrics are written to a temporary file first, then
+        moved into place, so a partly written file is never read.
+        The file is written as JSON if its name ends with .json,
+        and in the Prometheus text format otherwise, such as for a
+        .prom file read by the node exporter textfile collector.
+
+        Args:
+            path (str): Path to the metrics file
+
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp = tempfile.mkstemp(dir=directory)
+        with os.fdopen(fd, 'w') as fout:
+            if path.endswith('.json'):
+                self.write_json(fout)
+            else:
+                self.write_prometheus(fout)
+        os.chmod(tmp, 0o644)
+        replace(tmp, path)
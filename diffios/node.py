@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+File: node.py
+Author: Rob Phoenix
+Email: rob@robphoenix.com
+Github: https://github.com/robphoenix
+Description: Hierarchical blocks of Cisco IOS config
+
+"""
+import hashlib
+
+try:
+    from sys import intern
+except ImportError:
+    pass  # Python 2, intern is a builtin
+
+
+class Node(object):
+    """Node is a line of config and the lines nested beneath it.
+
+    Cisco IOS configs are hierarchical, and can be nested to
+    any depth, such as router bgp -> address-family -> neighbor.
+    Each Node holds a single line of config and the Nodes
+    indented beneath it. Nodes are compact, using __slots__ and
+    sharing an empty tuple between all Nodes without children,
+    and the text of each line is interned when it is a native
+    string, so that repeated lines are only held in memory once.
+
+    Each Node also has a digest, a hash of its line and the
+    digests of its children. As children are compared without
+    regard to their order, so is the digest, so any two Nodes
+    with the same digest have the same lines, nested in the
+    same way, and can be treated as matching without comparing
+    their children.
+
+    Attributes:
+        text (str): The line of config
+        children (list|tuple): Nodes nested beneath this line
+
+    Args:
+        text (str): The line of config
+
+    Kwargs:
+        children (list): Nodes nested beneath this line.
+            Defaults to no children.
+
+    >>> bgp = Node('router bgp 65000')
+    >>> family = Node(' address-family ipv4')
+    >>> bgp.add(family)
+    >>> family.add(Node('  neighbor 10.0.0.1 activate'))
+    >>> bgp.lines()
+    ['router bgp 65000', ' address-family ipv4', '  neighbor 10.0.0.1 activate']
+    >>> a = Node('line vty 0 4', [Node(' login local'), Node(' exec-timeout 5 0')])
+    >>> b = Node('line vty 0 4', [Node(' exec-timeout 5 0'), Node(' login local')])
+    >>> a.digest == b.digest
+    True
+
+    """
+
+    __slots__ = ('text', 'children', '_digest')
+
+    def __init__(self, text, children=None):
+        # only native strings can be interned, not unicode on Python 2
+        self.text = intern(text) if type(text) is str else text
+        self.children = children if children else ()
+        self._digest = None
+
+    @property
+    def digest(self):
+        """Hash of this line and the lines nested beneath it.
+
+        Calculated the first time it is used, so Nodes should not
+        be added to once their digest has been used.
+
+        Returns:
+            bytes: SHA-1 digest
+
+        """
+        if self._digest is None:
+            self._digest = self.combine(
+                self.text, (child.digest for child in self.children))
+        return self._digest
+
+    @staticmethod
+    def combine(text, digests):
+        """Hash a line of config with the digests nested beneath it.
+
+        Args:
+            text (str): The line of config
+            digests (iterable): Digests of the nested Nodes
+
+        Returns:
+            bytes: SHA-1 digest
+
+        """
+        fingerprint = hashlib.sha1(text.encode('utf-8') + b'\x00')
+        for digest in sorted(digests):
+            fingerprint.update(digest)
+        return fingerprint.digest()
+
+    def __len__(self):
+        return 1 + sum(len(child) for child in self.children)
+
+    def __repr__(self):
+        return 'Node({!r}, {!r})'.format(self.text, list(self.children))
+
+    def add(self, child):
+        """Nest a Node beneath this one.
+
+        Args:
+            child (diffios.Node): Node to nest
+
+        """
+        if self.children:
+            self.children.append(child)
+        else:
+            self.children = [child]
+
+    def lines(self):
+        """This line and every line nested beneath it, in order.
+
+        Returns:
+            list: Lines of config
+
+        """
+        lines = [self.text]
+        for child in self.children:
+            lines.extend(child.lines())
+        return lines
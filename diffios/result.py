@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+File: result.py
+Author: Rob Phoenix
+Email: rob@robphoenix.com
+Github: https://github.com/robphoenix
+Description: The result of comparing a Cisco IOS config against a baseline
+
+"""
+
+
+class DiffResult(object):
+    """DiffResult holds the result of a diffios.Compare.
+
+    DiffResult is immutable, its attributes cannot be reassigned,
+    and the lists it holds are shared with every accessor of the
+    diffios.Compare that produced it, so should not be modified.
+
+    Attributes:
+        missing (list): Sorted groups of lines in the baseline
+            config not present in the comparison config
+        additional (list): Sorted groups of lines in the comparison
+            config not present in the baseline config
+
+    >>> result = DiffResult([['interface Vlan1', ' shutdown']], [])
+    >>> result.missing
+    [['interface Vlan1', ' shutdown']]
+    >>> result.missing = []
+    Traceback (most recent call last):
+        ...
+    AttributeError: DiffResult is immutable
+
+    """
+
+    __slots__ = ('missing', 'additional')
+
+    def __init__(self, missing, additional):
+        object.__setattr__(self, 'missing', missing)
+        object.__setattr__(self, 'additional', additional)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('DiffResult is immutable')
+
+    def __delattr__(self, name):
+        raise AttributeError('DiffResult is immutable')
+
+    def __reduce__(self):
+        return (DiffResult, (self.missing, self.additional))
+
+    def __repr__(self):
+        return 'DiffResult(missing={!r}, additional={!r})'.format(
+            self.missing, self.additional)
+
+    @staticmethod
+    def _write_groups(fp, data, prefix):
+        indent = "\n{}      ".format(prefix)
+        for i, group in enumerate(data, 1):
+            fp.write("\n{} {:>3}: {}".format(prefix, i, group[0]))
+            if len(group) > 1:
+                fp.write(indent + indent.join(group[1:]))
+
+    def write_delta(self, fp):
+        """Write a human readable diff to a file object.
+
+        Missing lines are prefixed with a '-', additional lines are
+        prefixed with a '+', and each group is numbered, as in
+        diffios.Compare.delta().
+
+        Args:
+            fp (file): File, socket file or other object with a
+                write() method, open for writing text
+
+        """
+        fp.write("--- baseline\n"
+                 "+++ comparison"
+                 "\n")
+        self._write_groups(fp, self.missing, '-')
+        fp.write("\n")
+        self._write_groups(fp, self.additional, '+')
+        fp.write("\n")
+
+    @staticmethod
+    def _write_changes(fp, data):
+        for i, lines in enumerate(data):
+            if i:
+                fp.write("\n\n")
+            fp.write("\n".join(lines))
+
+    def write_additional(self, fp):
+        """Write additional lines to a file object, a group at a time.
+
+        Args:
+            fp (file): File, socket file or other object with a
+                write() method, open for writing text
+
+        """
+        self._write_changes(fp, self.additional)
+
+    def write_missing(self, fp):
+        """Write missing lines to a file object, a group at a time.
+
+        Args:
+            fp (file): File, socket file or other object with a
+                write() method, open for writing text
+
+        """
+        self._write_changes(fp, self.missing)
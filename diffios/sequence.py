@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+File: sequence.py
+Author: Rob Phoenix
+Email: rob@robphoenix.com
+Github: https://github.com/robphoenix
+Description: Compare the lines of order sensitive blocks in order
+
+"""
+import bisect
+import operator
+from collections import Counter
+
+import diffios
+
+MAX_COST = 128  # rounds of the middle snake search before giving up
+
+
+def parent_matcher(sequences):
+    """Compile the parent lines of blocks compared in order.
+
+    Args:
+        sequences (list|diffios.IgnoreMatcher): Parent lines, such
+            as '^ip access-list', treated in the same way as lines
+            to ignore, or an already compiled diffios.IgnoreMatcher
+
+    Returns:
+        diffios.IgnoreMatcher: Matcher of the parent lines, or None
+            if there are none
+
+    """
+    if not sequences:
+        return None
+    if isinstance(sequences, diffios.IgnoreMatcher):
+        return sequences
+    return diffios.IgnoreMatcher(
+        [line.strip().lower() for line in sequences])
+
+
+def edit_script(baseline, comparison, equal=None):
+    """Shortest edit script turning one sequence into another.
+
+    Uses the linear space O(ND) algorithm of Myers, "An O(ND)
+    Difference Algorithm and Its Variations", which finds the
+    middle snake of an optimal path and then solves each half, so
+    the time taken grows with the length of the sequences times
+    the number of differences D between them, and the memory used
+    only with their length. Two long sequences that barely differ
+    are compared in near linear time.
+
+    Searching for a middle snake stops after MAX_COST rounds, so
+    sequences that are mostly different, or reordered, are still
+    compared quickly, with an edit script that may not be the
+    shortest. Hashable items are then matched by the longest
+    increasing run of the items found once in each sequence, which
+    is exact for reordered lines that are all distinct, such as the
+    entries of an access list, and the gaps between them compared
+    in turn. Otherwise the sequences are split at the furthest
+    point reached.
+
+    Args:
+        baseline (list): Items of the baseline
+        comparison (list): Items of the comparison
+
+    Kwargs:
+        equal (callable): Whether a baseline item matches a
+            comparison item. Defaults to ==, and the items should
+            be hashable, such as integer IDs of lines.
+
+    Returns:
+        tuple: Positions of the baseline items deleted, and of the
+            comparison items inserted, each in order
+
+    >>> edit_script([1, 2, 3, 4], [1, 3, 4, 5])
+    ([1], [3])
+    >>> edit_script('abcabba', 'cbabac')
+    ([0, 2, 5], [0, 5])
+
+    """
+    hashable = equal is None
+    if hashable:
+        equal = operator.eq
+        if not set(baseline).intersection(comparison):
+            return (list(range(len(baseline))), list(range(len(comparison))))
+    deleted, inserted = [], []
+    todo = [(0, len(baseline), 0, len(comparison))]
+    while todo:
+        a_lo, a_hi, b_lo, b_hi = todo.pop()
+        while (a_lo < a_hi and b_lo < b_hi and
+               equal(baseline[a_lo], comparison[b_lo])):
+            a_lo += 1
+            b_lo += 1
+        while (a_hi > a_lo and b_hi > b_lo and
+               equal(baseline[a_hi - 1], comparison[b_hi - 1])):
+            a_hi -= 1
+            b_hi -= 1
+        if a_lo == a_hi or b_lo == b_hi:
+            deleted.extend(range(a_lo, a_hi))
+            inserted.extend(range(b_lo, b_hi))
+            continue
+        split = _middle_snake(baseline, comparison, equal,
+                              a_lo, a_hi, b_lo, b_hi)
+        if hashable and (split is None or not split[4]):
+            anchors = _unique_anchors(baseline, comparison,
+                                      a_lo, a_hi, b_lo, b_hi)
+            if anchors:
+                for x, y in anchors:
+                    todo.append((a_lo, x, b_lo, y))
+                    a_lo, b_lo = x + 1, y + 1
+                todo.append((a_lo, a_hi, b_lo, b_hi))
+                continue
+        if split is None:  # no progress can be made, replace it all
+            deleted.extend(range(a_lo, a_hi))
+            inserted.extend(range(b_lo, b_hi))
+            continue
+        x0, y0, x1, y1, _ = split
+        todo.append((a_lo + x1, a_hi, b_lo + y1, b_hi))
+        todo.append((a_lo, a_lo + x0, b_lo, b_lo + y0))
+    deleted.sort()
+    inserted.sort()
+    return (deleted, inserted)
+
+
+def _unique_anchors(a, b, a_lo, a_hi, b_lo, b_hi):
+    """Pairs of items found once in each sequence, in order in both.
+
+    The longest increasing run of the positions in b of the items
+    found once in each, taken in their order in a, found by
+    patience sorting.
+
+    Returns:
+        list: Positions in a and b of each pair, in order
+
+    """
+    counts = Counter(a[a_lo:a_hi])
+    positions = {}
+    for y in range(b_lo, b_hi):
+        item = b[y]
+        if counts.get(item) == 1:
+            positions[item] = None if item in positions else y
+    pairs = [(x, positions[a[x]]) for x in range(a_lo, a_hi)
+             if positions.get(a[x]) is not None]
+    tops, top_pairs, previous = [], [], []
+    for i, (x, y) in enumerate(pairs):
+        pile = bisect.bisect_left(tops, y)
+        if pile == len(tops):
+            tops.append(y)
+            top_pairs.append(i)
+        else:
+            tops[pile] = y
+            top_pairs[pile] = i
+        previous.append(top_pairs[pile - 1] if pile else None)
+    anchors = []
+    i = top_pairs[-1] if top_pairs else None
+    while i is not None:
+        anchors.append(pairs[i])
+        i = previous[i]
+    anchors.reverse()
+    return anchors
+
+
+def _middle_snake(a, b, equal, a_lo, a_hi, b_lo, b_hi):
+    """The middle snake of a shortest edit script, searched from both ends.
+
+    Returns:
+        tuple: Start and end of the snake, relative to a_lo and
+            b_lo, and whether it is the middle snake rather than
+            the furthest point reached in MAX_COST rounds, or None
+            if no split can be found
+
+    """
+    n, m = a_hi - a_lo, b_hi - b_lo
+    delta = n - m
+    odd = delta % 2
+    forward, backward = {1: 0}, {1: 0}
+    for d in range(min(MAX_COST, (n + m + 1) // 2) + 1):
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and forward[k - 1] < forward[k + 1]):
+                x = forward[k + 1]
+            else:
+                x = forward[k - 1] + 1
+            y = x - k
+            x0, y0 = x, y
+            while x < n and y < m and equal(a[a_lo + x], b[b_lo + y]):
+                x += 1
+                y += 1
+            forward[k] = x
+            if (odd and -(d - 1) <= delta - k <= d - 1 and
+                    x + backward[delta - k] >= n):
+                return (x0, y0, x, y, True)
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and backward[k - 1] < backward[k + 1]):
+                x = backward[k + 1]
+            else:
+                x = backward[k - 1] + 1
+            y = x - k
+            x0, y0 = x, y
+            while (x < n and y < m and
+                   equal(a[a_hi - x - 1], b[b_hi - y - 1])):
+                x += 1
+                y += 1
+            backward[k] = x
+            if (not odd and -d <= delta - k <= d and
+                    x + forward[delta - k] >= n):
+                return (n - x, m - y, n - x0, m - y0, True)
+    # too costly, split at the furthest point reached from the start
+    reached = [(x + x - k, x) for k, x in forward.items()
+               if -d <= k <= d and 0 <= x <= n and 0 <= x - k <= m]
+    if not reached:
+        return None
+    furthest, x = max(reached)
+    if furthest in (0, n + m):
+        return None
+    return (x, furthest - x, x, furthest - x, False)
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+File: stats.py
+Author: Rob Phoenix
+Email: rob@robphoenix.com
+Github: https://github.com/robphoenix
+Description: Time and count the phases of parsing and comparing configs
+
+"""
+import timeit
+
+
+class Stats(object):
+    """Stats records where the time of a comparison is spent.
+
+    Pass a Stats object to diffios.Config, diffios.Baseline,
+    diffios.Compare or diffios.compare_many, and it records the
+    wall time and number of calls of each phase of parsing and
+    comparing configs, and counts the regular expressions
+    evaluated. The same Stats object can be passed to many
+    comparisons to aggregate a batch, and Stats objects from
+    different processes can be combined with update().
+
+    Nothing is recorded, and nothing is slowed down, unless a
+    Stats object is passed.
+
+    Attributes:
+        times (dict): Total wall time, in seconds, of each phase
+        calls (dict): Number of times each phase ran
+        counts (dict): Number of each counted operation
+
+    >>> stats = Stats()
+    >>> with stats.phase('partition'):
+    ...     pass
+    >>> stats.count('ignore_searches', 3)
+    >>> stats.calls
+    {'partition': 1}
+    >>> stats.counts
+    {'ignore_searches': 3}
+
+    """
+
+    def __init__(self):
+        self.times = {}
+        self.calls = {}
+        self.counts = {}
+
+    def phase(self, name):
+        """Context manager timing a phase.
+
+        Args:
+            name (str): Name of the phase
+
+        Returns:
+            context manager: Adds its wall time to the phase on exit
+
+        """
+        return _Phase(self, name)
+
+    def count(self, name, n=1):
+        """Add to the count of an operation.
+
+        Args:
+            name (str): Name of the operation
+
+        Kwargs:
+            n (int): Number to add. Defaults to 1.
+
+        """
+        self.counts[name] = self.counts.get(name, 0) + n
+
+    def counting(self, name, obj, method):
+        """Context manager counting the calls to a method of an object.
+
+        The method is only wrapped while the context is open, so
+        the object is left as it was.
+
+        Args:
+            name (str): Name of the operation
+            obj (object): Object to count the calls of
+            method (str): Name of the method to count the calls to
+
+        Returns:
+            context manager: Counts calls to the method while open
+
+        """
+        return _Counting(self, name, obj, method)
+
+    def update(self, other):
+        """Add the times and counts of another Stats object to this one.
+
+        Args:
+            other (diffios.Stats): Stats to add
+
+        """
+        for mine, theirs in ((self.times, other.times),
+                             (self.calls, other.calls),
+                             (self.counts, other.counts)):
+            for name, value in theirs.items():
+                mine[name] = mine.get(name, 0) + value
+
+    def report(self):
+        """A table of the time of each phase and each count.
+
+        Returns:
+            str: Phases, slowest first, then counts
+
+        """
+        lines = ['{:<20} {:>8} {:>12}'.format('phase', 'calls', 'time (ms)')]
+        for name in sorted(self.times, key=self.times.get, reverse=True):
+            lines.append('{:<20} {:>8} {:>12.2f}'.format(
+                name, self.calls[name], self.times[name] * 1000))
+        for name in sorted(self.counts):
+            lines.append('{:<20} {:>8}'.format(name, self.counts[name]))
+        return '\n'.join(lines)
+
+    def __repr__(self):
+        return 'Stats(times={!r}, calls={!r}, counts={!r})'.format(
+            self.times, self.calls, self.counts)
+
+
+class _Phase(object):
+    __slots__ = ('stats', 'name', 'start')
+
+    def __init__(self, stats, name):
+        self.stats = stats
+        self.name = name
+
+    def __enter__(self):
+        self.start = timeit.default_timer()
+
+    def __exit__(self, *exc):
+        elapsed = timeit.default_timer() - self.start
+        stats, name = self.stats, self.name
+        stats.times[name] = stats.times.get(name, 0) + elapsed
+        stats.calls[name] = stats.calls.get(name, 0) + 1
+
+
+class _Counting(object):
+    __slots__ = ('stats', 'name', 'obj', 'method')
+
+    def __init__(self, stats, name, obj, method):
+        self.stats = stats
+        self.name = name
+        self.obj = obj
+        self.method = method
+
+    def __enter__(self):
+        counts, name = self.stats.counts, self.name
+        function = getattr(self.obj, self.method)
+
+        def counted(*args, **kwargs):
+            counts[name] = counts.get(name, 0) + 1
+            return function(*args, **kwargs)
+        counts.setdefault(name, 0)
+        setattr(self.obj, self.method, counted)
+
+    def __exit__(self, *exc):
+        delattr(self.obj, self.method)
+
+
+class _NoPhase(object):
+    __slots__ = ()
+
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *exc):
+        pass
+
+
+NO_PHASE = _NoPhase()
+
+
+def phase(stats, name):
+    """Time a phase with stats, or do nothing if stats is None."""
+    if stats is None:
+        return NO_PHASE
+    return stats.phase(name)
+
+
+def counting(stats, name, obj, method):
+    """Count calls to a method with stats, or do nothing if stats is None."""
+    if stats is None:
+        return NO_PHASE
+    return stats.counting(name, obj, method)
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+File: table.py
+Author: Rob Phoenix
+Email: rob@robphoenix.com
+Github: https://github.com/robphoenix
+Description: Share identical blocks of Cisco IOS config across a batch
+
+"""
+import diffios
+
+
+class BlockTable(object):
+    """BlockTable shares identical blocks between the configs of a batch.
+
+    Across a fleet of devices, blocks such as 'line vty 0 4' and
+    most interfaces repeat with identical lines. Configs parsed
+    with the same BlockTable hold a single diffios.Node for each
+    distinct block, so repeated blocks are held in memory, and
+    their digests calculated, only once. Comparisons made with
+    the BlockTable also remember the differences found between a
+    baseline block and a config block, so a block repeated
+    across the batch is only compared once.
+
+    A BlockTable only grows, so should be used for one batch of
+    configs, compared against one baseline.
+
+    Attributes:
+        hits (int): Comparisons of blocks found in the table
+        misses (int): Comparisons of blocks added to the table
+
+    >>> table = BlockTable()
+    >>> a = diffios.Config(['line vty 0 4', ' login local'], table=table)
+    >>> b = diffios.Config(['line vty 0 4', ' login local'], table=table)
+    >>> a.blocks()[0] is b.blocks()[0]
+    True
+    >>> len(table)
+    2
+
+    """
+
+    def __init__(self):
+        self._nodes = {}
+        self._results = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def intern(self, node):
+        """The shared diffios.Node with the same lines as a Node.
+
+        Nodes are the same when their lines, and the lines nested
+        beneath them, are the same and in the same order.
+
+        Args:
+            node (diffios.Node): Node to share
+
+        Returns:
+            diffios.Node: Shared Node, which is node itself if no
+                Node with the same lines has been seen before
+
+        """
+        children = node.children
+        if children:
+            children = tuple(map(self.intern, children))
+        key = (node.text, children)  # children are compared by identity
+        shared = self._nodes.get(key)
+        if shared is None:
+            if any(a is not b for a, b in zip(children, node.children)):
+                node = diffios.Node(node.text, list(children))
+            shared = self._nodes[key] = node
+        return shared
+
+    def result(self, key, compare, *args):
+        """The remembered result of comparing two blocks.
+
+        Args:
+            key (tuple): Key identifying the blocks compared
+            compare (callable): Compares the blocks, called with
+                args when the result is not yet known
+
+        Returns:
+            object: Result of compare
+
+        """
+        try:
+            result = self._results[key]
+        except KeyError:
+            self.misses += 1
+            result = self._results[key] = compare(*args)
+        else:
+            self.hits += 1
+        return result
@@ -14,6 +14,9 @@ BASELINE_FILE = os.path.join(
     os.getcwd(), "configs", "baselines", "baseline.txt")
 
 output = os.path.join(os.getcwd(), "diffs.csv")
+metrics_output = os.path.join(os.getcwd(), "metrics.json")
+baseline = diffios.Baseline(BASELINE_FILE, IGNORE_FILE)
+metrics = diffios.FleetMetrics()
 
 with open(output, 'w') as csvfile:
     csvwriter = csv.writer(csvfile, lineterminator='\n')
@@ -24,7 +27,7 @@ with open(output, 'w') as csvfile:
         #  print("diffios: {:>3}/{} Processing: {}".format(i, num_files, fin),
         #        end="\r")
         comparison_file = os.path.join(COMPARISON_DIR, fin)
-        diff = diffios.Compare(BASELINE_FILE, comparison_file, IGNORE_FILE)
+        diff = metrics.measure(baseline, comparison_file)
         csvwriter.writerow([
             fin,
             os.path.basename(BASELINE_FILE),
@@ -34,3 +37,5 @@ with open(output, 'w') as csvfile:
         print("diffios: {} ({}/{})".format(fin, i, num_files))
         print(diff.delta())
     print("diffios: Report: {}".format(output))
+metrics.save(metrics_output)
+print("diffios: Metrics: {}".format(metrics_output))
@@ -26,4 +26,7 @@ setup(
         'Programming Language :: Python :: 3.6',
         'License :: OSI Approved :: MIT License',
     ],
-    packages=find_packages(exclude=('tests', 'docs')))
+    packages=find_packages(exclude=('tests', 'docs')),
+    entry_points={
+        'console_scripts': ['diffios = diffios.cli:main'],
+    })
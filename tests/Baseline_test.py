@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import os
+import sys
+try:
+    from unittest import mock
+except ImportError:
+    from mock import mock
+
+sys.path.insert(0, os.path.abspath('..'))
+
+from .context import diffios
+
+
+def test_baseline_compare_matches_compare(aaa_baseline, aaa_comparison,
+                                          ignores_file):
+    """
+    Should give the same diff as diffios.Compare.
+    """
+    ignores = ignores_file.split('\n')
+    expected = diffios.Compare(aaa_baseline, aaa_comparison, ignores)
+    actual = diffios.Baseline(aaa_baseline, ignores).compare(aaa_comparison)
+    assert expected.missing() == actual.missing()
+    assert expected.additional() == actual.additional()
+
+
+def test_baseline_shares_compiled_ignore_lines():
+    """
+    Should parse compared configs with the baseline's compiled
+    lines to ignore.
+    """
+    baseline = diffios.Baseline(['hostname {{ hostname }}'], ['hostname'])
+    with mock.patch.object(diffios.IgnoreMatcher, '_compile') as compile:
+        diff = baseline.compare(['hostname R1', 'interface Vlan1'])
+        assert not compile.called
+    assert diff.comparison.ignored() == [['hostname R1']]
+    assert diff.additional() == [['interface Vlan1']]
+
+
+def test_templates_are_compiled_once():
+    """
+    Should compile the lines containing variables when the
+    baseline is created, not when configs are compared.
+    """
+    baseline = diffios.Baseline([
+        'interface Vlan1', ' ip address {{ ip }} 255.255.255.0',
+        'hostname R1'
+    ])
+    assert [g[0] for g in baseline.templates()] == ['interface Vlan1']
+    assert [g for g, _ in baseline.literals()] == [['hostname R1']]
+    with mock.patch.object(baseline, '_compile_template') as compile_template:
+        for i in range(3):
+            diff = baseline.compare([
+                'hostname R1', 'interface Vlan1',
+                ' ip address 10.0.0.{} 255.255.255.0'.format(i)
+            ])
+            assert diff.missing() == []
+            assert diff.additional() == []
+        assert not compile_template.called
+
+
+def test_compare_compiles_config_given_as_baseline():
+    """
+    Should compile a diffios.Config given as a baseline without
+    parsing it again.
+    """
+    config = diffios.Config(['hostname {{ hostname }}', 'interface Vlan1'])
+    included = config.included()
+    diff = diffios.Compare(config, ['hostname R1'])
+    assert isinstance(diff.baseline, diffios.Baseline)
+    assert diff.baseline.included() is included
+    assert diff.missing() == [['interface Vlan1']]
+
+
+def test_typed_variables_only_match_their_type():
+    """
+    Should only match typed variables with values of that type.
+    """
+    baseline = diffios.Baseline([
+        'interface Vlan{{ VLAN:int }}',
+        ' ip address {{ IP:ipv4 }} {{ MASK:ipv4mask }}',
+        ' description {{ DESCRIPTION:rest }}',
+        'ip route {{ NET:ipv4prefix }} Null0'
+    ])
+    valid = [
+        'interface Vlan10', ' ip address 10.0.0.1 255.255.255.0',
+        ' description users and voice', 'ip route 10.0.0.0/8 Null0'
+    ]
+    diff = baseline.compare(valid)
+    assert diff.missing() == []
+    assert diff.additional() == []
+    invalid = [
+        'interface Vlan10', ' ip address 10.0.0.256 255.255.0.255',
+        ' description users and voice', 'ip route 10.0.0.0/33 Null0'
+    ]
+    diff = baseline.compare(invalid)
+    assert diff.missing() == [
+        ['interface Vlan{{ VLAN:int }}',
+         ' ip address {{ IP:ipv4 }} {{ MASK:ipv4mask }}'],
+        ['ip route {{ NET:ipv4prefix }} Null0']
+    ]
+
+
+def test_unknown_variable_type_matches_any_text():
+    """
+    Should treat a variable with an unknown type as untyped.
+    """
+    baseline = diffios.Baseline(['hostname {{ SITE:CODE }}'])
+    assert baseline.compare(['hostname LON 01']).missing() == []
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath('..'))
+
+from .context import diffios
+
+BASELINE = ['hostname {{ hostname }}',
+            'line vty 0 4',
+            ' login local',
+            ' transport input ssh',
+            'interface Vlan{{ VLAN }}',
+            ' description {{ DESCRIPTION }}',
+            ' no shutdown']
+
+
+def router_config(i):
+    return ['hostname R{}'.format(i),
+            'line vty 0 4',
+            ' login local',
+            ' transport input telnet ssh',
+            'interface Vlan1',
+            ' description users',
+            ' shutdown']
+
+
+def test_configs_share_identical_blocks():
+    """
+    Should hold one Node for identical blocks across configs.
+    """
+    table = diffios.BlockTable()
+    a = diffios.Config(router_config(1), table=table)
+    b = diffios.Config(router_config(2), table=table)
+    shared = [block for block in a.blocks() if block in b.blocks()]
+    assert [block.text for block in shared] == ['interface Vlan1',
+                                                'line vty 0 4']
+    assert b.included() == diffios.Config(router_config(2)).included()
+
+
+def test_repeated_blocks_are_compared_once():
+    """
+    Should give the same result with a table, comparing each
+    repeated block only once.
+    """
+    table = diffios.BlockTable()
+    baseline = diffios.Baseline(BASELINE, [], table=table)
+    for i in range(3):
+        diff = baseline.compare(router_config(i))
+        expected = diffios.Compare(BASELINE, router_config(i), [])
+        assert diff.missing() == expected.missing()
+        assert diff.additional() == expected.additional()
+    assert table.misses == 2
+    assert table.hits == 4
+
+
+def test_compare_many_with_table(write_configs, workers):
+    """
+    Should give the same results with a table, in or out of process.
+    """
+    paths = write_configs([router_config(i) for i in range(4)])
+    expected = {path: diffios.Compare(BASELINE, path, []).missing()
+                for path in paths}
+    results = diffios.compare_many(BASELINE, paths, [], workers=workers,
+                                   table=diffios.BlockTable())
+    assert {path: result.missing for path, result in results} == expected
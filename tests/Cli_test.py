@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import csv
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath('..'))
+
+from .context import diffios
+from diffios import cli
+
+
+def test_find_configs_expands_directories_and_globs(fleet_files):
+    """
+    Should find each config once, from directories and glob patterns.
+    """
+    _, directory = fleet_files
+    found = cli.find_configs([directory,
+                              os.path.join(directory, 'router[01].conf')])
+    assert [os.path.basename(path) for path in found] == [
+        'router{}.conf'.format(i) for i in range(6)]
+
+
+def test_main_writes_jsonl(tmpdir, fleet_files):
+    """
+    Should write one JSON object for each config, matching Compare.
+    """
+    baseline, directory = fleet_files
+    output = str(tmpdir.join('diffs.jsonl'))
+    assert cli.main([baseline, directory, '-j', '1', '-f', 'jsonl',
+                     '-o', output]) == 0
+    with open(output) as fin:
+        results = [json.loads(line) for line in fin]
+    assert len(results) == 6
+    for result in results:
+        diff = diffios.Compare(baseline, result['comparison'], [])
+        assert result['missing'] == diff.missing()
+        assert result['additional'] == diff.additional()
+
+
+def test_main_writes_csv(tmpdir, fleet_files):
+    """
+    Should write a CSV row for each config, after a header row.
+    """
+    baseline, directory = fleet_files
+    output = str(tmpdir.join('diffs.csv'))
+    assert cli.main([baseline, directory, '-j', '1', '-f', 'csv',
+                     '-o', output]) == 0
+    with open(output) as fin:
+        rows = list(csv.reader(fin))
+    assert rows[0] == ["Comparison", "Baseline", "Additional", "Missing",
+                       "Error"]
+    assert sorted(row[2] for row in rows[1:]) == ['', '', ''] + [
+        'interface Vlan1' + '\n no shutdown' * n for n in (1, 3, 5)]
+
+
+def test_main_reports_missing_baseline(tmpdir, fleet_files, capsys):
+    """
+    Should report a baseline that cannot be opened and fail.
+    """
+    _, directory = fleet_files
+    assert cli.main([str(tmpdir.join('nope.txt')), directory, '-j', '1']) == 1
+    assert 'could not open' in capsys.readouterr().err
+
+
+def test_main_compares_sequences_in_order(tmpdir):
+    """
+    Should compare the lines of the given sequences in order.
+    """
+    baseline = tmpdir.join('baseline.txt')
+    baseline.write('ip access-list standard MGMT\n permit 10.0.0.1\n'
+                   ' deny any\n')
+    config = tmpdir.join('config.txt')
+    config.write('ip access-list standard MGMT\n deny any\n'
+                 ' permit 10.0.0.1\n')
+    output = str(tmpdir.join('diffs.jsonl'))
+    for options, missing in [([], []),
+                             (['--sequence', '^ip access-list'],
+                              [['ip access-list standard MGMT',
+                                ' permit 10.0.0.1']])]:
+        assert cli.main([str(baseline), str(config), '-j', '1', '-f',
+                         'jsonl', '-o', output] + options) == 0
+        with open(output) as fin:
+            assert json.loads(fin.read())['missing'] == missing
+
+
+def test_main_reports_bad_configs_and_carries_on(tmpdir, fleet_files, capsys):
+    """
+    Should write an error for each config that cannot be read, compare
+    the rest and fail at the end.
+    """
+    baseline, directory = fleet_files
+    tmpdir.join('configs', 'latin1.conf').write_binary(b'hostname \xff\n')
+    dangling = str(tmpdir.join('configs', 'gone.conf'))
+    for fmt in ('text', 'csv', 'jsonl'):
+        output = str(tmpdir.join('diffs.' + fmt))
+        for jobs in ('1', '2'):
+            assert cli.main([baseline, directory, dangling, '-j', jobs,
+                             '-f', fmt, '-o', output]) == 1
+            with open(output) as fin:
+                written = fin.read()
+            assert written.count('router') == 6
+            assert 'latin1.conf' in written
+            assert 'gone.conf' in written
+    with open(str(tmpdir.join('diffs.jsonl'))) as fin:
+        results = [json.loads(line) for line in fin]
+    errors = sorted(r['comparison'] for r in results if 'error' in r)
+    assert [os.path.basename(path) for path in errors] == ['gone.conf',
+                                                           'latin1.conf']
+    assert 'could not open' in capsys.readouterr().err
@@ -1,5 +1,11 @@
+import io
 import os
 import sys
+import time
+try:
+    from unittest import mock
+except ImportError:
+    from mock import mock
 
 sys.path.append(os.path.abspath("."))
 sys.path.insert(0, os.path.abspath('..'))
@@ -279,3 +285,427 @@ def test_prefix_lists_with_seq_value_in_ip_address():
     diff = diffios.Compare(baseline, config, [])
     assert [] == diff.additional()
     assert [] == diff.missing()
+
+
+def test_nested_blocks_are_compared_as_units():
+    """ Lines nested in different sub-blocks are not the same line """
+    baseline = [
+        'router bgp 65000',
+        ' address-family ipv4 vrf RED',
+        '  neighbor 10.0.0.1 activate',
+        ' address-family ipv4 vrf BLUE',
+        '  redistribute connected'
+    ]
+    config = [
+        'router bgp 65000',
+        ' address-family ipv4 vrf RED',
+        '  redistribute connected',
+        ' address-family ipv4 vrf BLUE',
+        '  neighbor 10.0.0.1 activate'
+    ]
+    diff = diffios.Compare(baseline, config, [])
+    assert diff.missing() == [[
+        'router bgp 65000',
+        ' address-family ipv4 vrf RED',
+        '  neighbor 10.0.0.1 activate',
+        ' address-family ipv4 vrf BLUE',
+        '  redistribute connected'
+    ]]
+    assert diff.additional() == [[
+        'router bgp 65000',
+        ' address-family ipv4 vrf RED',
+        '  redistribute connected',
+        ' address-family ipv4 vrf BLUE',
+        '  neighbor 10.0.0.1 activate'
+    ]]
+
+
+def test_templated_nested_blocks_are_compared_as_units():
+    """ Templated blocks are also compared level by level """
+    baseline = ['router bgp 1',
+                ' address-family ipv4',
+                '  neighbor {{ N }} activate',
+                ' address-family ipv6',
+                '  network 2001::/64']
+    config = ['router bgp 1',
+              ' address-family ipv4',
+              '  network 2001::/64',
+              ' address-family ipv6',
+              '  neighbor 10.0.0.1 activate']
+    diff = diffios.Compare(baseline, config, [])
+    assert diff.missing() == [baseline]
+    assert diff.additional() == [config]
+    assert diff.summary() == (1, 5, 1, 5)
+
+
+def test_templated_nested_lines_are_given_with_context():
+    """ Lines nested in templated blocks keep the lines above them """
+    baseline = ['router bgp {{ AS }}',
+                ' address-family ipv4',
+                '  neighbor {{ N }} activate',
+                ' address-family ipv6',
+                '  network 2001::/64']
+    config = ['router bgp 1',
+              ' address-family ipv4',
+              '  neighbor 10.0.0.1 activate',
+              '  neighbor 10.0.0.2 activate',
+              ' address-family ipv6',
+              '  network 2001::/64']
+    diff = diffios.Compare(baseline, config, [])
+    assert diff.missing() == []
+    assert diff.additional() == [['router bgp 1',
+                                  ' address-family ipv4',
+                                  '  neighbor 10.0.0.2 activate']]
+
+
+def test_missing_nested_block_is_reported_whole():
+    """ A missing sub-block is missing along with its nested lines """
+    baseline = [
+        'router bgp 65000',
+        ' bgp log-neighbor-changes',
+        ' address-family ipv6',
+        '  neighbor 2001:db8::1 activate'
+    ]
+    config = ['router bgp 65000', ' bgp log-neighbor-changes']
+    diff = diffios.Compare(baseline, config, [])
+    assert diff.missing() == [[
+        'router bgp 65000',
+        ' address-family ipv6',
+        '  neighbor 2001:db8::1 activate'
+    ]]
+    assert diff.additional() == []
+
+
+def test_identical_configs_are_not_searched():
+    """ Configs with the same included lines finish without a search """
+    baseline = ['hostname R1', 'interface Vlan1', ' shutdown', ' no ip address']
+    config = ['interface Vlan1', ' no ip address', ' shutdown', 'hostname R1']
+    diff = diffios.Compare(baseline, config, [])
+    with mock.patch.object(diff, '_hash_lookup') as hash_lookup:
+        assert diff.missing() == []
+        assert diff.additional() == []
+        assert not hash_lookup.called
+
+
+def test_identical_blocks_are_not_compared_line_by_line():
+    """ Blocks with the same lines are matched without comparing children """
+    baseline = ['hostname R1', 'interface Vlan1', ' shutdown']
+    config = ['hostname R2', 'interface Vlan1', ' shutdown']
+    diff = diffios.Compare(baseline, config, [])
+    with mock.patch.object(diff, '_child_lookup') as child_lookup:
+        assert diff.missing() == [['hostname R1']]
+        assert diff.additional() == [['hostname R2']]
+        assert not child_lookup.called
+
+
+def test_diff_is_computed_once():
+    """ Every accessor shares a single search """
+    baseline = ['hostname R1', 'interface Vlan1', ' shutdown']
+    config = ['hostname R2', 'interface Vlan1', ' no shutdown']
+    diff = diffios.Compare(baseline, config, [])
+    with mock.patch.object(diff, '_search', wraps=diff._search) as search:
+        diff.delta()
+        diff.missing()
+        diff.additional()
+        diff.pprint_missing()
+        diff.pprint_additional()
+        assert search.call_count == 1
+    assert diff.result().missing == diff.missing()
+    assert diff.result().additional == diff.additional()
+
+
+def test_templated_parent_found_among_similar_parents():
+    """ Templated parent matches wherever it sorts among candidates """
+    baseline = ['ip route {{ NET }} 255.0.0.0 {{ GATEWAY }}']
+    config = [
+        'ip route 10.0.0.0 255.0.0.0 192.168.0.1',
+        'ip route 20.0.0.0 255.255.0.0 192.168.0.1',
+        'ip route 30.0.0.0 255.255.0.0 192.168.0.1'
+    ]
+    diff = diffios.Compare(baseline, config, [])
+    assert diff.missing() == []
+    assert diff.additional() == [
+        ['ip route 20.0.0.0 255.255.0.0 192.168.0.1'],
+        ['ip route 30.0.0.0 255.255.0.0 192.168.0.1']
+    ]
+
+
+def test_templated_parent_only_tries_parents_with_same_prefix():
+    """ Templated parent is only compared with parents sharing its prefix """
+    baseline = ['interface Vlan{{ VLAN }}', ' ip address {{ IP }}']
+    config = ['hostname R1', 'ip routing', 'interface Vlan10',
+              ' ip address 10.0.0.1', 'line vty 0 4']
+    diff = diffios.Compare(baseline, config, [])
+    with mock.patch.object(diff, '_compare_lines',
+                           wraps=diff._compare_lines) as compare_lines:
+        assert diff.missing() == []
+        tried = [call[0][1] for call in compare_lines.call_args_list]
+        assert 'hostname R1' not in tried
+        assert 'line vty 0 4' not in tried
+
+
+def test_repeated_child_lines_are_counted():
+    """ Each occurrence of a repeated child line is matched once """
+    baseline = ['object-group network SERVERS',
+                ' host 10.0.0.1', ' host 10.0.0.1', ' host 10.0.0.2']
+    config = ['object-group network SERVERS',
+              ' host 10.0.0.3', ' host 10.0.0.1', ' host 10.0.0.3']
+    diff = diffios.Compare(baseline, config, [])
+    assert diff.missing() == [['object-group network SERVERS',
+                               ' host 10.0.0.1', ' host 10.0.0.2']]
+    assert diff.additional() == [['object-group network SERVERS',
+                                  ' host 10.0.0.3', ' host 10.0.0.3']]
+
+
+def test_large_block_comparison():
+    """ Large blocks are compared entry by entry """
+    entries = [' permit ip host 10.0.{}.{} any'.format(i // 250, i % 250)
+               for i in range(5000)]
+    baseline = ['ip access-list extended BIG'] + entries
+    config = ['ip access-list extended BIG'] + entries[1:] + [' deny ip any any']
+    diff = diffios.Compare(baseline, config, [])
+    assert diff.missing() == [['ip access-list extended BIG', entries[0]]]
+    assert diff.additional() == [['ip access-list extended BIG',
+                                  ' deny ip any any']]
+
+
+def test_templated_children_prefer_most_specific_line():
+    """ Child lines matching several templates use the most specific one """
+    baseline = ['router bgp {{ AS }}',
+                ' neighbor {{ IP }} {{ OPTION }}',
+                ' neighbor {{ IP }} remote-as 100']
+    config = ['router bgp 65000',
+              ' neighbor 10.0.0.1 shutdown',
+              ' neighbor 10.0.0.1 remote-as 100']
+    diff = diffios.Compare(baseline, config, [])
+    assert diff.missing() == []
+    assert diff.additional() == []
+
+
+def test_templated_children_fall_back_when_template_used_up():
+    """ Child lines try other templates once their match is used up """
+    baseline = ['router bgp {{ AS }}',
+                ' neighbor {{ IP }} {{ OPTION }}',
+                ' neighbor {{ IP }} remote-as 100']
+    config = ['router bgp 65000',
+              ' neighbor 10.0.0.1 remote-as 100',
+              ' neighbor 10.0.0.2 remote-as 100',
+              ' neighbor 10.0.0.3 remote-as 100']
+    diff = diffios.Compare(baseline, config, [])
+    assert diff.missing() == []
+    assert diff.additional() == [['router bgp 65000',
+                                  ' neighbor 10.0.0.3 remote-as 100']]
+
+
+def test_used_up_templates_are_left_out_of_the_child_pattern():
+    """ Child lines are matched once more, not line by line, when used up """
+    baseline = ['object-group network SERVERS',
+                ' network-object host {{ A }}']
+    baseline.extend(' network-object object OBJ{} {{{{ X }}}}'.format(i)
+                    for i in range(300))
+    config = ['object-group network SERVERS']
+    config.extend(' network-object host 10.0.{}.{}'.format(i // 250, i % 250)
+                  for i in range(2000))
+    stats = diffios.Stats()
+    diff = diffios.Compare(baseline, config, [], stats=stats)
+    assert diff.summary() == (1, 301, 1, 2000)
+    assert stats.counts['template_matches'] == 2001
+
+
+def test_summary_counts_groups_and_lines():
+    """ summary() counts the groups and lines of missing and additional """
+    baseline = ['hostname {{ HOSTNAME }}',
+                'interface Vlan{{ VLAN }}',
+                ' description {{ DESCRIPTION }}',
+                ' no shutdown',
+                'router ospf 1',
+                ' area 0',
+                '  authentication',
+                'ip domain name diffios.dev']
+    config = ['hostname R1',
+              'interface Vlan10',
+              ' description users',
+              ' shutdown',
+              'router ospf 1',
+              ' area 0',
+              '  range 10.0.0.0/8',
+              'ip route 0.0.0.0 0.0.0.0 10.0.0.1']
+    summary = diffios.Compare(baseline, config, []).summary()
+    diff = diffios.Compare(baseline, config, [])
+    assert summary == (len(diff.missing()),
+                       sum(len(group) for group in diff.missing()),
+                       len(diff.additional()),
+                       sum(len(group) for group in diff.additional()))
+    assert diff.summary() == summary
+
+
+def test_is_compliant_stops_at_first_missing_line():
+    """ is_compliant() stops at the first missing line """
+    baseline = ['hostname R1', 'interface Vlan{{ VLAN }}', ' no shutdown']
+    config = ['interface Vlan1', ' no shutdown']
+    diff = diffios.Compare(baseline, config, [])
+    with mock.patch.object(diff, '_pair_templates') as pair_templates:
+        assert not diff.is_compliant()
+    assert not pair_templates.called
+    assert diff.is_compliant() is False
+    assert diffios.Compare(baseline, baseline, []).is_compliant()
+
+
+def test_is_compliant_strict_rejects_additional_lines():
+    """ is_compliant(strict=True) also rejects additional lines """
+    diff = diffios.Compare(['hostname R1'], ['hostname R1', 'end'], [])
+    assert diff.is_compliant()
+    assert not diff.is_compliant(strict=True)
+
+
+def test_ordered_comparison_keeps_config_order():
+    """ Ordered comparisons keep each config's block order """
+    baseline = ['snmp-server community {{ COMMUNITY }} RO',
+                'interface Vlan{{ VLAN }}',
+                ' no shutdown',
+                ' description {{ DESCRIPTION }}',
+                'aaa new-model']
+    config = ['interface Vlan1',
+              ' shutdown',
+              ' description users',
+              'zzz',
+              'hostname R1']
+    diff = diffios.Compare(baseline, config, [], ordered=True)
+    assert diff.missing() == [['snmp-server community {{ COMMUNITY }} RO'],
+                              ['interface Vlan{{ VLAN }}', ' no shutdown'],
+                              ['aaa new-model']]
+    assert diff.additional() == [['interface Vlan1', ' shutdown'],
+                                 ['zzz'],
+                                 ['hostname R1']]
+    assert diff.summary() == diffios.Compare(baseline, config, []).summary()
+
+
+def test_ordered_comparison_matches_the_same_templates():
+    """ Ordered comparisons only change the order of the differences """
+    baseline = ['interface Gi0/{{ N }}',
+                ' switchport mode access']
+    config = ['interface Gi0/3',
+              ' switchport mode access',
+              'interface Gi0/2',
+              ' switchport mode access',
+              'interface Gi0/1',
+              ' switchport mode access']
+    diff = diffios.Compare(baseline, config, [], ordered=True)
+    assert diff.missing() == []
+    assert diff.additional() == [['interface Gi0/3', ' switchport mode access'],
+                                 ['interface Gi0/2', ' switchport mode access']]
+    diff = diffios.Compare(baseline, config, [])
+    assert diff.additional() == [['interface Gi0/2', ' switchport mode access'],
+                                 ['interface Gi0/3', ' switchport mode access']]
+    baseline = ['vlan {{ V }}', ' name USERS']
+    config = ['vlan 20', ' name OTHER', 'vlan 10', ' name USERS']
+    for ordered in (False, True):
+        diff = diffios.Compare(baseline, config, [], ordered=ordered)
+        assert diff.missing() == []
+        assert diff.additional() == [['vlan 20', ' name OTHER']]
+
+
+def test_exact_parents_are_matched_before_templated_parents():
+    """ Parents without variables claim their config block first """
+    baseline = ['interface Gi0/1',
+                ' description {{ D }}',
+                'interface Gi0/{{ N }}',
+                ' switchport mode access']
+    config = ['interface Gi0/1',
+              ' description uplink',
+              'interface Gi0/2',
+              ' switchport mode access']
+    diff = diffios.Compare(baseline, config, [])
+    assert diff.missing() == []
+    assert diff.additional() == []
+    assert diff.summary() == (0, 0, 0, 0)
+
+
+def test_baseline_compare_keeps_ordered_setting():
+    """ Baseline.compare() uses the order set for the baseline """
+    baseline = diffios.Baseline(['hostname R1'], [], ordered=True)
+    diff = baseline.compare(['zzz', 'aaa'])
+    assert diff.ordered
+    assert diff.comparison.ordered
+    assert diff.additional() == [['zzz'], ['aaa']]
+
+
+def test_writers_match_string_output():
+    """ write_* methods stream the same text as the string methods """
+    baseline = ['interface Vlan1', ' no shutdown', 'hostname R1']
+    config = ['interface Vlan1', ' shutdown', ' description users', 'end']
+    diff = diffios.Compare(baseline, config, [])
+    for write, text in [(diff.write_delta, diff.delta),
+                        (diff.write_missing, diff.pprint_missing),
+                        (diff.write_additional, diff.pprint_additional)]:
+        fp = io.StringIO()
+        write(fp)
+        assert fp.getvalue() == text()
+
+
+def test_sequences_are_compared_in_order():
+    """ Children of sequences are compared in order, others as sets """
+    baseline = ['ip access-list extended EDGE',
+                ' permit tcp any any eq 22',
+                ' permit tcp any any eq 443',
+                ' deny ip any any',
+                'line vty 0 4',
+                ' login local',
+                ' transport input ssh']
+    config = ['ip access-list extended EDGE',
+              ' deny ip any any',
+              ' permit tcp any any eq 22',
+              ' permit tcp any any eq 443',
+              'line vty 0 4',
+              ' transport input ssh',
+              ' login local']
+    assert diffios.Compare(baseline, config, []).missing() == []
+    diff = diffios.Compare(baseline, config, [],
+                           sequences=['^ip access-list'])
+    assert diff.missing() == [['ip access-list extended EDGE',
+                               ' deny ip any any']]
+    assert diff.additional() == [['ip access-list extended EDGE',
+                                  ' deny ip any any']]
+    assert diff.summary() == (1, 2, 1, 2)
+    assert not diff.is_compliant()
+    assert diffios.Compare(baseline, baseline, [],
+                           sequences=['^ip access-list']).is_compliant()
+
+
+def test_templated_sequences_are_compared_in_order():
+    """ Children of templated sequences are matched in order """
+    baseline = diffios.Baseline(['route-map {{ NAME }} permit 10',
+                                 ' match ip address prefix-list {{ LIST }}',
+                                 ' set local-preference 200'], [],
+                                sequences=['^route-map'])
+    diff = baseline.compare(['route-map RM permit 10',
+                             ' match ip address prefix-list CUSTOMERS',
+                             ' set local-preference 200'])
+    assert diff.missing() == []
+    diff = baseline.compare(['route-map RM permit 10',
+                             ' set local-preference 200',
+                             ' match ip address prefix-list CUSTOMERS'])
+    assert diff.missing() == [['route-map {{ NAME }} permit 10',
+                               ' match ip address prefix-list {{ LIST }}']]
+    assert diff.additional() == [['route-map RM permit 10',
+                                  ' match ip address prefix-list CUSTOMERS']]
+
+
+def test_large_reordered_sequence_is_compared_quickly():
+    """ Large reordered sequences are compared in linear space """
+    entries = [' permit tcp host 10.0.{}.{} any eq 22'.format(i // 250,
+                                                              i % 250)
+               for i in range(5000)]
+    baseline = ['ip access-list extended BIG'] + entries
+    config = ['ip access-list extended BIG'] + entries[::-1]
+    start = time.time()
+    diff = diffios.Compare(baseline, config, [],
+                           sequences=['^ip access-list'])
+    assert diff.summary() == (1, 5000, 1, 5000)
+    assert time.time() - start < 5
+    moved = entries[:100] + entries[101:4000] + [entries[100]] + entries[4000:]
+    diff = diffios.Compare(baseline, ['ip access-list extended BIG'] + moved,
+                           [], sequences=['^ip access-list'])
+    assert diff.missing() == [['ip access-list extended BIG', entries[100]]]
+    assert diff.additional() == [['ip access-list extended BIG',
+                                  entries[100]]]
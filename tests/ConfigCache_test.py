@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import os
+import sys
+try:
+    from unittest import mock
+except ImportError:
+    from mock import mock
+
+sys.path.insert(0, os.path.abspath('..'))
+
+from .context import diffios
+
+
+def test_cached_config_matches_parsed_config(tmpdir, baseline, ignores_file):
+    """
+    Should load the same partition from the cache as from parsing.
+    """
+    path = tmpdir.join('baseline.conf')
+    path.write(baseline)
+    ignores = ignores_file.split('\n')
+    cache = diffios.ConfigCache(str(tmpdir.join('cache')))
+    expected = diffios.Config(str(path), ignores, cache=cache)
+    with mock.patch.object(diffios.Config, '_check_data',
+                           wraps=diffios.Config._check_data) as check_data:
+        actual = diffios.Config(str(path), ignores, cache=cache)
+        assert check_data.call_count == 1  # only the ignore lines
+    assert expected.included() == actual.included()
+    assert expected.ignored() == actual.ignored()
+    assert expected.digest() == actual.digest()
+    assert expected.config == actual.config
+
+
+def test_cache_is_keyed_by_content_and_ignore_lines(tmpdir):
+    """
+    Should not load a cached config once the file or the lines
+    to ignore have changed.
+    """
+    path = tmpdir.join('router.conf')
+    path.write('hostname R1\ninterface Vlan1\n')
+    cache = diffios.ConfigCache(str(tmpdir.join('cache')))
+    diffios.Config(str(path), ['hostname'], cache=cache)
+    conf = diffios.Config(str(path), [], cache=cache)
+    assert conf.included() == [['hostname R1'], ['interface Vlan1']]
+    path.write('hostname R2\n')
+    conf = diffios.Config(str(path), [], cache=cache)
+    assert conf.included() == [['hostname R2']]
+
+
+def test_cache_is_keyed_by_block_order(tmpdir):
+    """
+    Should not load a sorted cached config as an ordered config.
+    """
+    path = tmpdir.join('router.conf')
+    path.write('interface Vlan1\nhostname R1\n')
+    cache = diffios.ConfigCache(str(tmpdir.join('cache')))
+    diffios.Config(str(path), [], cache=cache)
+    conf = diffios.Config(str(path), [], cache=cache, ordered=True)
+    assert conf.included() == [['interface Vlan1'], ['hostname R1']]
+
+
+def test_cache_evicts_least_recently_used(tmpdir):
+    """
+    Should remove the oldest records to stay under max_size.
+    """
+    cache_dir = tmpdir.join('cache')
+    cache = diffios.ConfigCache(str(cache_dir), max_size=1)
+    for i in range(3):
+        path = tmpdir.join('router{}.conf'.format(i))
+        path.write('hostname R{}\n'.format(i))
+        diffios.Config(str(path), cache=cache)
+    assert len(cache_dir.listdir()) <= 1
+
+
+def test_cache_replaces_records_in_place(tmpdir):
+    """
+    Should replace a stored record without removing it first, so
+    it is never missing.
+    """
+    cache = diffios.ConfigCache(str(tmpdir.join('cache')))
+    block = diffios.Node('hostname R1')
+    cache.put('router', [], [block])
+    with mock.patch('os.remove') as remove:
+        cache.put('router', [['hostname R2']], [block])
+    assert not remove.called
+    ignored, blocks = cache.get('router')
+    assert ignored == [['hostname R2']]
+    assert [b.text for b in blocks] == ['hostname R1']
@@ -1,6 +1,8 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
+import io
 import os
+import re
 import sys
 try:
     from unittest import mock
@@ -22,6 +24,20 @@ def test_raises_error_if_config_not_given():
         diffios.Config()
 
 
+def test_config_accepts_unicode_lines():
+    """
+    Should parse lines that are not native strings, such as
+    unicode on Python 2, without interning them.
+    """
+    class Line(type(u'')):
+        pass
+    node = diffios.Node(Line(u'interface Vlan1'), [diffios.Node(u' shutdown')])
+    assert node.lines() == ['interface Vlan1', ' shutdown']
+    config = diffios.Config([u'interface Vlan1', u' shutdown', u'hostname R1'])
+    assert config.included() == [['hostname R1'],
+                                 ['interface Vlan1', ' shutdown']]
+
+
 def test_raises_error_if_config_file_does_not_exist():
     """
     Should raise Runtime Error if given config file does not exist.
@@ -48,6 +64,18 @@ def test_raises_error_if_invalid_data_given():
         diffios.Config({'data': 'invalid'})
 
 
+def test_raises_error_if_config_file_cannot_be_decoded(tmpdir):
+    """
+    Should Raise Runtime Error if config file is not valid UTF-8.
+    """
+    path = tmpdir.join('latin1.conf')
+    path.write_binary(b'hostname \xff\xfe R2\n')
+    with pytest.raises(RuntimeError):
+        diffios.Config(str(path)).included()
+    with pytest.raises(RuntimeError):
+        diffios.Config.from_mmap(str(path))
+
+
 def test_raises_error_if_provided_ignore_file_does_not_exist():
     """
     Should raise Runtime Error if given ignores file does not exist.
@@ -245,3 +273,248 @@ def test_deal_correctly_with_regex_metacharacters_in_ignore_lines():
         "**********************************************************************"
     ]
     assert diffios.Config(config, ignore_lines).included() == expected
+
+
+def test_ignore_lines_are_matched_independently_of_each_other():
+    """
+    Anchored and unanchored ignore lines should each behave as they
+    would on their own when compiled together.
+    """
+    config = [
+        'hostname ROUTER', 'end', 'endpoint tracking',
+        'interface FastEthernet0/1', ' description **Link to Core**',
+        ' ip address 192.168.0.1 255.255.255.0'
+    ]
+    ignore_lines = ['^end$', '^ description', 'HOSTNAME']
+    d = diffios.Config(config, ignore_lines)
+    assert d.ignored() == [['end'], ['hostname ROUTER'],
+                           [' description **Link to Core**']]
+    assert d.included() == [['endpoint tracking'], [
+        'interface FastEthernet0/1', ' ip address 192.168.0.1 255.255.255.0'
+    ]]
+
+
+def test_ignore_lines_match_as_regular_expressions():
+    """
+    Anchored prefixes, plain substrings and regular expressions in the
+    ignore_lines should ignore exactly the lines re.search would find.
+    """
+    config = [
+        'interface FastEthernet0/1', ' description Link to Core',
+        ' descriptions', ' ip address 192.168.0.1 255.255.255.0',
+        ' ip access-group 1 in', 'ip route 0.0.0.0 0.0.0.0 10.0.0.1',
+        'snmp-server community public RO', 'ntp clock-period 17179'
+    ]
+    ignore_lines = ['^ desc', '^ ip address ', '^ip', 'community',
+                    '^ntp clock-period [0-9]{5}$']
+    matched = [line for line in config for ignore in ignore_lines
+               if re.search(ignore, line.lower())]
+    d = diffios.Config(config, ignore_lines)
+    assert sorted(sum(d.ignored(), [])) == sorted(matched)
+    assert d.included() == [['interface FastEthernet0/1',
+                             ' ip access-group 1 in']]
+
+
+def test_partition_is_computed_once():
+    """
+    Should group and partition the config once, however many
+    times included() and ignored() are called.
+    """
+    config = ['hostname ROUTER', 'interface Vlan1', ' no ip address']
+    d = diffios.Config(config, ['hostname'])
+    with mock.patch.object(
+            d, '_partition_groups', wraps=d._partition_groups) as partition:
+        d.included()
+        d.ignored()
+        d.included()
+        assert partition.call_count == 1
+
+
+def test_partition_is_recomputed_when_attributes_are_reassigned():
+    """
+    Should drop the cached partition when config or ignore_lines
+    are reassigned.
+    """
+    d = diffios.Config(['hostname ROUTER', 'interface Vlan1'], ['hostname'])
+    assert d.ignored() == [['hostname ROUTER']]
+    d.ignore_lines = ['vlan1']
+    assert d.ignored() == [['interface Vlan1']]
+    d.config = ['interface Vlan2']
+    assert d.included() == [['interface Vlan2']]
+    assert d.ignored() == []
+
+
+def test_config_from_generator():
+    """
+    Should read config lines from any iterable, such as a generator.
+    """
+    lines = ['!\n', 'interface Vlan1\n', ' no ip address \n', 'hostname R1\n']
+    d = diffios.Config(line for line in lines)
+    assert d.config == ['!', 'interface Vlan1', ' no ip address ',
+                        'hostname R1']
+    assert d.included() == [['hostname R1'],
+                            ['interface Vlan1', ' no ip address']]
+
+
+def test_config_and_ignore_lines_from_file_objects():
+    """
+    Should read config and ignore lines from open file objects.
+    """
+    config = io.StringIO(u'hostname R1\r\ninterface Vlan1\r\n shutdown\r\n')
+    ignores = io.StringIO(u'Hostname\n')
+    d = diffios.Config(config, ignores)
+    assert d.ignore_lines == ['hostname']
+    assert d.ignored() == [['hostname R1']]
+    assert d.included() == [['interface Vlan1', ' shutdown']]
+
+
+def test_config_from_mmap_matches_config_from_file(tmpdir, baseline,
+                                                   ignores_file):
+    """
+    Should partition a memory-mapped config file the same as
+    reading the file normally.
+    """
+    path = tmpdir.join('baseline.conf')
+    path.write(baseline.replace('\n', '\r\n'))
+    ignores = ignores_file.split('\n') + ['^ description']
+    expected = diffios.Config(str(path), ignores)
+    actual = diffios.Config.from_mmap(str(path), ignores)
+    assert expected.included() == actual.included()
+    assert expected.ignored() == actual.ignored()
+    assert expected.config == actual.config
+
+
+def test_config_from_mmap_ignores_lines_with_other_characters(tmpdir):
+    """
+    Should ignore lines with characters other than ASCII regardless of
+    case, as Config does.
+    """
+    config = [u'interface Vlan1', u' description \xc4B', u' no shutdown',
+              u'banner motd \xdcN\xcf']
+    path = tmpdir.join('utf8.conf')
+    path.write_binary(u'\n'.join(config).encode('utf-8'))
+    ignore_lines = [u'^ description \xe4', u'\xfcn\xef']
+    mapped = diffios.Config.from_mmap(str(path), ignore_lines)
+    assert mapped.included() == [['interface Vlan1', ' no shutdown']]
+    assert mapped.included() == diffios.Config(config,
+                                               ignore_lines).included()
+
+
+def test_config_from_mmap_sorts_repeated_blocks_as_config_does(tmpdir):
+    """
+    Should sort blocks by their included lines, so repeated parent
+    lines are compared the same way as for Config.
+    """
+    path = tmpdir.join('repeated.conf')
+    path.write('\n'.join(['interface X', ' description a', ' shutdown',
+                          'interface X', ' no shutdown']))
+    ignores = ['^ description']
+    expected = diffios.Config(str(path), ignores)
+    actual = diffios.Config.from_mmap(str(path), ignores)
+    assert expected.included() == actual.included()
+    baseline = ['interface X', ' shutdown']
+    assert (diffios.Compare(baseline, expected, ignores).missing() ==
+            diffios.Compare(baseline, actual, ignores).missing())
+
+
+def test_ignored_lines_of_mmap_config_keep_shared_blocks(tmpdir):
+    """
+    Should keep sharing blocks through the table once ignored()
+    has read the file again.
+    """
+    path = tmpdir.join('shared.conf')
+    path.write('\n'.join(['hostname R1', 'line vty 0 4', ' login local']))
+    table = diffios.BlockTable()
+    mapped = diffios.Config.from_mmap(str(path), ['hostname'], table=table)
+    assert mapped.ignored() == [['hostname R1']]
+    config = diffios.Config(str(path), ['hostname'], table=table)
+    assert mapped.blocks()[0] is config.blocks()[0]
+
+
+def test_config_from_mmap_with_empty_file(tmpdir):
+    """
+    Should create an empty config from an empty file.
+    """
+    path = tmpdir.join('empty.conf')
+    path.write('')
+    conf = diffios.Config.from_mmap(str(path))
+    assert conf.included() == []
+    assert conf.ignored() == []
+
+
+def test_config_from_mmap_raises_error_if_file_does_not_exist():
+    """
+    Should raise RuntimeError if the given file does not exist.
+    """
+    with pytest.raises(RuntimeError):
+        diffios.Config.from_mmap('file_that_does_not_exist')
+
+
+def test_nested_blocks_are_built_from_indentation():
+    """
+    Should nest lines beneath the closest less indented line.
+    """
+    config = [
+        'router bgp 65000', ' bgp log-neighbor-changes',
+        ' address-family ipv4', '  neighbor 10.0.0.1 activate',
+        '  neighbor 10.0.0.2 activate', ' exit-address-family'
+    ]
+    block, = diffios.Config(config).blocks()
+    assert block.text == 'router bgp 65000'
+    assert [c.text for c in block.children] == [
+        ' bgp log-neighbor-changes', ' address-family ipv4',
+        ' exit-address-family'
+    ]
+    assert [c.text for c in block.children[1].children] == [
+        '  neighbor 10.0.0.1 activate', '  neighbor 10.0.0.2 activate'
+    ]
+    assert block.lines() == config
+
+
+def test_lines_nested_beneath_ignored_line_are_ignored():
+    """
+    Should ignore every line nested beneath an ignored child line.
+    """
+    config = [
+        'router bgp 65000', ' address-family ipv6',
+        '  neighbor 2001:db8::1 activate', ' address-family ipv4',
+        '  neighbor 10.0.0.1 activate'
+    ]
+    d = diffios.Config(config, ['address-family ipv6'])
+    assert d.ignored() == [[
+        ' address-family ipv6', '  neighbor 2001:db8::1 activate'
+    ]]
+    assert d.included() == [[
+        'router bgp 65000', ' address-family ipv4',
+        '  neighbor 10.0.0.1 activate'
+    ]]
+
+
+def test_lines_ignored_two_levels_deep_are_not_included(tmpdir):
+    """
+    Should leave a line ignored two levels deep out of the included
+    lines and the blocks, as from_mmap does.
+    """
+    config = ['router bgp 1', ' address-family ipv4',
+              '  neighbor 1.1.1.1 activate',
+              '  neighbor 2.2.2.2 remote-as 1']
+    d = diffios.Config(config, ['activate'])
+    expected = [['router bgp 1', ' address-family ipv4',
+                 '  neighbor 2.2.2.2 remote-as 1']]
+    assert d.ignored() == [['  neighbor 1.1.1.1 activate']]
+    assert d.included() == expected
+    assert [block.lines() for block in d.blocks()] == expected
+    path = tmpdir.join('bgp.conf')
+    path.write('\n'.join(config))
+    mapped = diffios.Config.from_mmap(str(path), ['activate'])
+    assert mapped.included() == expected
+    assert mapped.digest() == d.digest()
+
+
+def test_ordered_config_keeps_block_order():
+    """ Ordered configs keep blocks in the order they appear """
+    config = ['interface Vlan2', ' no shutdown', 'hostname R1', 'aaa new-model']
+    assert diffios.Config(config, [], ordered=True).included() == [
+        ['interface Vlan2', ' no shutdown'], ['hostname R1'], ['aaa new-model']]
+    assert diffios.Config(config, []).included() == [
+        ['aaa new-model'], ['hostname R1'], ['interface Vlan2', ' no shutdown']]
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import json
+import os
+import sys
+try:
+    from unittest import mock
+except ImportError:
+    from mock import mock
+
+sys.path.insert(0, os.path.abspath('..'))
+
+from .context import diffios
+
+
+def test_compare_many_records_metrics_of_each_config(fleet, workers):
+    """
+    Should record the metrics of each config, in or out of process.
+    """
+    baseline, paths = fleet
+    metrics = diffios.FleetMetrics()
+    list(diffios.compare_many(baseline, paths, [], workers=workers,
+                              metrics=metrics))
+    devices = {d['device']: d for d in metrics.devices}
+    assert sorted(devices) == paths
+    assert devices[paths[0]]['missing_lines'] == 2
+    assert devices[paths[0]]['additional_groups'] == 1
+    assert devices[paths[1]]['missing_lines'] == 0
+    assert devices[paths[1]]['lines'] == 3
+    assert all(d['regex_evaluations'] > 0 for d in devices.values())
+    assert metrics.summary()['devices'] == 6
+
+
+def test_metrics_saved_as_prometheus_and_json(tmpdir, fleet):
+    """
+    Should save a Prometheus textfile, or JSON for a .json path.
+    """
+    baseline, paths = fleet
+    metrics = diffios.FleetMetrics()
+    compiled = diffios.Baseline(baseline, [])
+    for path in paths:
+        metrics.measure(compiled, path)
+    prom = tmpdir.join('diffios.prom')
+    metrics.save(str(prom))
+    text = prom.read()
+    assert 'diffios_devices 6\n' in text
+    assert 'diffios_device_duration_seconds{quantile="0.99"}' in text
+    assert 'diffios_config_missing_lines{{device="{}"}} 2\n'.format(
+        paths[0]) in text
+    with mock.patch('os.remove') as remove:
+        metrics.save(str(prom))  # replaced, never removed
+    assert not remove.called
+    json_path = tmpdir.join('diffios.json')
+    metrics.save(str(json_path))
+    saved = json.loads(json_path.read())
+    assert saved['devices'] == 6
+    assert [d['device'] for d in saved['device']] == paths
+
+
+def test_summary_quantiles_use_nearest_rank():
+    """
+    Should give the nearest-rank quantiles of the durations.
+    """
+    metrics = diffios.FleetMetrics()
+    for duration in (2.0, 1.0):
+        stats = diffios.Stats()
+        stats.times['device'] = duration
+        metrics.record(['hostname R1'], diffios.DiffResult([], []), stats)
+    assert metrics.summary()['device_duration_seconds'] == {
+        '0.5': 1.0, '0.9': 2.0, '0.99': 2.0}
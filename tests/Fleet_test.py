@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath('..'))
+
+from .context import diffios
+
+
+def test_compare_many_matches_compare(fleet, workers):
+    """
+    Should give the same result for each config as diffios.Compare,
+    whether run in parallel or not.
+    """
+    baseline, paths = fleet
+    expected = {}
+    for path in paths:
+        diff = diffios.Compare(baseline, path, [])
+        expected[path] = (diff.missing(), diff.additional())
+    results = diffios.compare_many(baseline, paths, workers=workers)
+    actual = {path: (result.missing, result.additional)
+              for path, result in results}
+    assert expected == actual
+
+
+def test_compare_many_uses_ignore_lines(fleet):
+    """
+    Should parse the baseline and configs with the given lines to ignore.
+    """
+    baseline, paths = fleet
+    results = diffios.compare_many(
+        baseline, paths, ignore_lines=['shutdown'], workers=2)
+    for path, result in results:
+        assert result.missing == []
+        assert result.additional == []
+
+
+def test_compare_many_keeps_going_past_bad_configs(tmpdir, fleet, workers):
+    """
+    Should yield the error for a config that cannot be read when
+    keep_going is set, and raise it otherwise.
+    """
+    baseline, paths = fleet
+    missing = str(tmpdir.join('missing.conf'))
+    results = dict(diffios.compare_many(baseline, paths + [missing],
+                                        workers=workers, keep_going=True))
+    assert isinstance(results.pop(missing), RuntimeError)
+    assert all(isinstance(result, diffios.DiffResult)
+               for result in results.values())
+    with pytest.raises(RuntimeError):
+        list(diffios.compare_many(baseline, [missing], workers=workers))
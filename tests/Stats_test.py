@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import os
+import pickle
+import sys
+
+sys.path.insert(0, os.path.abspath('..'))
+
+from .context import diffios
+
+BASELINE = ['hostname {{ hostname }}',
+            'interface Vlan1',
+            ' no shutdown',
+            'router bgp {{ AS }}',
+            ' neighbor {{ IP }} remote-as 100']
+CONFIG = ['hostname R1',
+          'interface Vlan1',
+          ' shutdown',
+          'router bgp 65000',
+          ' neighbor 10.0.0.1 remote-as 100']
+
+
+def test_compare_records_phases_and_counts():
+    """
+    Should record the phases of parsing and comparing, and count
+    the regular expressions evaluated.
+    """
+    stats = diffios.Stats()
+    diff = diffios.Compare(BASELINE, CONFIG, ['hostname'], stats=stats)
+    assert diff.missing() == [['interface Vlan1', ' no shutdown']]
+    for name in ['validate', 'group', 'partition', 'compile', 'digest',
+                 'hash_lookup', 'with_vars_search', 'order']:
+        assert name in stats.times
+    assert stats.calls['partition'] == 2
+    assert stats.counts['ignore_searches'] == 10
+    assert stats.counts['template_matches'] == 2
+    assert '_compare_lines' not in vars(diff)
+    assert '_ignore_line' not in vars(diff.comparison)
+
+
+def test_compare_counts_every_child_pattern_match():
+    """
+    Should count the match of each child of a templated block
+    against the pattern of the baseline children.
+    """
+    baseline = ['router bgp {{ AS }}']
+    baseline.extend(' neighbor 10.0.{} {{{{ IP }}}}'.format(i)
+                    for i in range(50))
+    config = ['router bgp 65000']
+    config.extend(' neighbor 10.0.{} 1.1.1.1'.format(i) for i in range(50))
+    stats = diffios.Stats()
+    diff = diffios.Compare(baseline, config, [], stats=stats)
+    assert diff.summary().missing_groups == 0
+    assert stats.counts['template_matches'] == 51
+
+
+def test_compare_without_stats_records_nothing():
+    """
+    Should not wrap anything when no stats are given.
+    """
+    diff = diffios.Compare(BASELINE, CONFIG, [])
+    assert diff.stats is None
+    assert diff.summary().missing_groups == 1
+
+
+def test_stats_aggregate_across_batch(write_configs, workers):
+    """
+    Should aggregate the stats of every comparison of a batch,
+    including those in worker processes.
+    """
+    paths = write_configs([CONFIG] * 4)
+    stats = diffios.Stats()
+    baseline = diffios.Baseline(BASELINE, [], stats=stats)
+    results = list(diffios.compare_many(baseline, paths, workers=workers,
+                                        stats=stats))
+    assert len(results) == 4
+    assert stats.calls['hash_lookup'] == 4
+    assert stats.calls['compile'] == 1
+
+
+def test_stats_update_and_pickle():
+    """
+    Should add the times and counts of other stats, and pickle.
+    """
+    stats, other = diffios.Stats(), diffios.Stats()
+    stats.count('template_matches')
+    other.count('template_matches', 2)
+    with other.phase('read'):
+        pass
+    stats.update(pickle.loads(pickle.dumps(other)))
+    assert stats.counts == {'template_matches': 3}
+    assert stats.calls == {'read': 1}
+    assert 'read' in stats.report()
@@ -248,3 +248,41 @@ clock summer-time BST recurring last Sun Mar 2:00 last Sun Oct 2:00
 system mtu routing 1500
 authentication mac-move permit
 authentication critical recovery delay 600""".split('\n')
+
+
+@pytest.fixture
+def write_configs(tmpdir):
+    def write(configs):
+        directory = tmpdir.join('configs')
+        directory.ensure(dir=True)
+        paths = []
+        for i, lines in enumerate(configs):
+            path = directory.join('router{}.conf'.format(i))
+            path.write('\n'.join(lines) + '\n')
+            paths.append(str(path))
+        return paths
+    return write
+
+
+@pytest.fixture
+def fleet(write_configs):
+    baseline = ['hostname {{ hostname }}', 'interface Vlan1', ' shutdown']
+    configs = []
+    for i in range(6):
+        lines = ['hostname R{}'.format(i), 'interface Vlan1']
+        lines += [' shutdown'] if i % 2 else [' no shutdown'] * (i + 1)
+        configs.append(lines)
+    return baseline, write_configs(configs)
+
+
+@pytest.fixture
+def fleet_files(tmpdir, fleet):
+    baseline, paths = fleet
+    path = tmpdir.join('baseline.txt')
+    path.write('\n'.join(baseline) + '\n')
+    return str(path), os.path.dirname(paths[0])
+
+
+@pytest.fixture(params=[1, 2])
+def workers(request):
+    return request.param